@@ -1,9 +1,83 @@
+import argparse
+import json
 import sys
+from typing import List
 
 from credit_calculator.calculator import Calculator
+from credit_calculator.metrics import metrics
+from credit_calculator.portfolio import revalue
+from credit_calculator.profiling import PROFILERS
+from credit_calculator.profiling import Profile
+from credit_calculator.replay import replay
+from credit_calculator.summary import BatchSummary
 
-if __name__ == '__main__':
-    calc = Calculator()
-    output = calc.calculate(sys.argv[1:])
+
+def runtime_options(args: List[str]):
+    """
+    Split runtime options (metrics, profiling, portfolio runs, etc.) from the calculation arguments.
+
+    :param args: Command line arguments
+    :return: Runtime options and the remaining calculation arguments
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--metrics', help='Record metrics and write them to this file (.json for a JSON snapshot, '
+                                          'anything else for Prometheus text).')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=PROFILERS,
+                        help='Profile the run with cProfile (default) or the sampling profiler.')
+    parser.add_argument('--profile-output', default='credit_calc',
+                        help='Path prefix for the .pstats and .collapsed profile files.')
+    parser.add_argument('--profile-top', type=int, default=10,
+                        help='Number of hot calculator functions to summarize on stderr.')
+    parser.add_argument('--revalue', metavar='LOANS',
+                        help='Revalue a CSV loan file, only recalculating loans that changed since the last snapshot.')
+    parser.add_argument('--snapshot', default='snapshot.json', help='Revaluation snapshot, updated after each run.')
+    parser.add_argument('--delta', default='delta.jsonl', help='Where to write the revaluation delta.')
+    parser.add_argument('--summary', help='Write payment, overpayment and term statistics of a revaluation to this file.')
+    parser.add_argument('--replay', metavar='SESSIONS',
+                        help='Replay recorded interactive sessions from a JSON lines file, one result per line.')
+
+    return parser.parse_known_args(args)
+
+
+def main(args: List[str]) -> None:
+    options, calculation_args = runtime_options(args)
+
+    if options.metrics:
+        metrics.enable()
+
+    if options.revalue:
+        def run():
+            summary = BatchSummary() if options.summary else None
+            revaluation = revalue(options.revalue, options.snapshot, options.delta, summary)
+
+            if summary is not None:
+                with open(options.summary, 'w') as file:
+                    json.dump(summary.report(), file, indent=2)
+
+            return revaluation.summary()
+    elif options.replay:
+        def run():
+            report = replay(options.replay)
+            print(report.summary(), file=sys.stderr)
+
+            return "\n".join(json.dumps(result.to_dict()) for result in report.results)
+    else:
+        def run():
+            return Calculator().calculate(calculation_args)
+
+    if options.profile:
+        profile = Profile(options.profile)
+        output = profile.run(run)
+        profile.write(options.profile_output)
+        profile.print_summary(options.profile_top)
+    else:
+        output = run()
 
     print(output)
+
+    if options.metrics:
+        metrics.write(options.metrics)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,30 +1,45 @@
 from math import ceil
 from math import log
-from math import pow
+from typing import Callable
 from typing import List
 
 from credit_calculator.argument_parser import ArgumentParser
 from credit_calculator.choice import Choice
+from credit_calculator.conventions import Convention
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.conventions import get_convention
 from credit_calculator.errors.missing_parameter_error import MissingParameterError
 from credit_calculator.errors.negative_parameter_error import NegativeValueError
 from credit_calculator.errors.too_many_values_error import TooManyValuesError
 from credit_calculator.errors.value_missing_error import ValueMissingError
+from credit_calculator.helpers.schedule_helper import differentiated_payments
 from credit_calculator.helpers.value_helper import value_missing
+from credit_calculator.metrics import instrument
+from credit_calculator.metrics import metrics
 from credit_calculator.prompt import Prompt
 
 ERR_INCORRECT_PARAMETERS = "Incorrect parameters"
 
 
 class Calculator(object):
-    def __init__(self):
+    def __init__(self, convention: Convention = MONTHLY):
         """
         Calculator for various loan parameters given other known values.
+
+        :param convention: Payment and compounding frequency used unless the arguments ask for another one
         """
+        self.default_convention = convention
+        self.convention = convention
         self.argument_parser = ArgumentParser()
         self.arguments = None
-        self.calc_prompt: Prompt = None
+        # Numbers behind the last result: payment, overpayment, term in pay periods and, for annuities, principal.
+        self.values: dict = None
 
-        # Needed ONLY for interactive mode.
+        # Needed ONLY for interactive mode.  Prompts are built on first use and read their answers through the reader,
+        # input() if there is none.
+        self.reader: Callable[[str], str] = None
+        self.type_prompt: Prompt = None
+        self.calc_prompt: Prompt = None
         self.principal_prompt: Prompt = None
         self.payment_prompt: Prompt = None
         self.timeframe_prompt: Prompt = None
@@ -37,8 +52,23 @@ class Calculator(object):
         :param rate: Rate to convert
         :return: Converted interest rate
         """
-        return (rate / 12) / 100
+        return self.convention.periodic_rate(rate)
 
+    @instrument('format_output')
+    def _format_output(self, result: str, overpayment: int) -> str:
+        """
+        Private function to append the overpayment to a result, if overpaid.
+
+        :param result: Result text
+        :param overpayment: Overpayment amount
+        :return: Output shown to the user
+        """
+        if overpayment > 0:
+            result += f"\nOverpayment = {overpayment}"
+
+        return result
+
+    @instrument('check_arguments')
     def _check_arguments(self, args: List[str]) -> list:
         """
         Check if arguments are valid.
@@ -85,6 +115,21 @@ class Calculator(object):
 
         return [calculation_type, principal, interest, pay_periods, payment]
 
+    def _argument_convention(self) -> Convention:
+        """
+        Private function to pick the convention asked for by the arguments.
+
+        :return: Convention from the arguments, or the calculator's default convention if none was given
+        """
+        frequency = self.arguments.frequency
+        compounding = self.arguments.compounding
+
+        if value_missing(frequency) and value_missing(compounding):
+            return self.default_convention
+
+        return get_convention(frequency or self.default_convention.payment_frequency, compounding)
+
+    @instrument('calculate')
     def calculate(self, args: List[str]) -> str:
         """
         Calculate a missing parameter for a loan given the other parameters and their values.
@@ -93,9 +138,15 @@ class Calculator(object):
         :type args: List[str]
         :return: String with the calculated missing value or an error message.
         """
+        self.values = None
+
         if args:
+            checked = False
+
             try:
                 calculation_type, principal, interest, pay_periods, payment = self._check_arguments(args)
+                checked = True
+                self.convention = self._argument_convention()
 
                 if calculation_type == 'annuity':
                     if value_missing(pay_periods):
@@ -110,11 +161,19 @@ class Calculator(object):
                         return self.differentiate_payment(principal, pay_periods, interest)
                     else:
                         raise ValueMissingError
-            except (MissingParameterError, NegativeValueError, ValueMissingError, TooManyValuesError):
+            except (MissingParameterError, NegativeValueError, ValueMissingError, TooManyValuesError) as error:
+                # Errors from _check_arguments are already counted under check_arguments.
+                if checked:
+                    metrics.count_error('calculate', error)
+
                 return ERR_INCORRECT_PARAMETERS
         else:
+            # Interactive mode has no frequency prompts, so it always uses the default convention.
+            self.convention = self.default_convention
+
             return self.interactive_mode()
 
+    @instrument('annuity_payment')
     def annuity_payment(self, principal: int, timeframe: int, interest_rate: float):
         """
         Calculate the current payment as an annuity.
@@ -127,19 +186,13 @@ class Calculator(object):
         :param interest_rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
         :return: String showing the payment and overpayment, if overpaid
         """
-        i = self._interest_rate(interest_rate)
-        power = pow(1 + i, timeframe)
-        numerator = i * power
-        denominator = power - 1
-        payment = ceil(principal * (numerator / denominator))
+        payment = ceil(principal * self.convention.payment_factor(interest_rate, timeframe))
         overpayment = (payment * timeframe) - principal
-        output = f"Your annuity payment = {payment}!"
-
-        if overpayment > 0:
-            output += f"\nOverpayment = {overpayment}"
+        self.values = {'principal': principal, 'payment': payment, 'overpayment': overpayment, 'term': timeframe}
 
-        return output
+        return self._format_output(f"Your annuity payment = {payment}!", overpayment)
 
+    @instrument('annuity_principal')
     def annuity_principal(self, payment: int, timeframe: int, interest_rate: float) -> str:
         """
         Calculate the principal on an annuity-style payment loan with overpayment amount if overpaid.
@@ -149,20 +202,13 @@ class Calculator(object):
         :param interest_rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
         :return: String showing the principal and overpayment, if overpaid
         """
-        i = self._interest_rate(interest_rate)
-        power = pow(1 + i, timeframe)
-        numerator = i * power
-        denominator = power - 1
-        principal = round(payment / (numerator / denominator))
+        principal = round(payment / self.convention.payment_factor(interest_rate, timeframe))
         overpayment = (payment * timeframe) - principal
+        self.values = {'principal': principal, 'payment': payment, 'overpayment': overpayment, 'term': timeframe}
 
-        output = f"Your credit principal = {principal}!"
-
-        if overpayment > 0:
-            output += f"\nOverpayment = {overpayment}"
-
-        return output
+        return self._format_output(f"Your credit principal = {principal}!", overpayment)
 
+    @instrument('annuity_timeframe')
     def annuity_timeframe(self, principal: int, payment: int, interest_rate: float):
         """
         Calculate the amount of time that it will take to pay off the loan, with overpayment.
@@ -173,11 +219,17 @@ class Calculator(object):
         :return: String showing timeframe in months and years as well as any overpayment if overpaid
         """
         interest = self._interest_rate(interest_rate)
-        inner_function = payment / (payment - interest * principal)
-        pay_periods = ceil(log(inner_function, 1 + interest))
 
-        years, months = divmod(pay_periods, 12)
+        # Without interest the loan is paid off in straight installments.
+        if interest == 0:
+            pay_periods = ceil(principal / payment)
+        else:
+            inner_function = payment / (payment - interest * principal)
+            pay_periods = ceil(log(inner_function, 1 + interest))
+
+        years, months = divmod(pay_periods, self.convention.payments_per_year)
         overpayment = (payment * pay_periods) - principal
+        self.values = {'principal': principal, 'payment': payment, 'overpayment': overpayment, 'term': pay_periods}
 
         def pluralize(singular: str, plural: str, number: int):
             if abs(number) == 1:
@@ -187,7 +239,8 @@ class Calculator(object):
 
         output = "You need "
         year_string = pluralize('year', 'years', years)
-        month_string = pluralize('month', 'months', months)
+        period_name = self.convention.period_name
+        month_string = pluralize(period_name, f"{period_name}s", months)
 
         if years > 0:
             output += f"{years} {year_string} "
@@ -200,11 +253,9 @@ class Calculator(object):
 
         output += "to repay this credit!"
 
-        if overpayment > 0:
-            output += f"\nOverpayment = {overpayment}"
-
-        return output
+        return self._format_output(output, overpayment)
 
+    @instrument('differentiate_payment')
     def differentiate_payment(self, principal: int, timeframe: int, interest_rate: float) -> str:
         """
         Calculate all future loan payments.
@@ -218,36 +269,20 @@ class Calculator(object):
         :param interest_rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
         :return: String showing the payments and overpayment, if overpaid
         """
-        m = 1
-        balance = principal
-        paid = 0
-        output = ""
-
-        while balance > 0:
-            interest = self._interest_rate(interest_rate)
-            formula = (principal / timeframe) + interest * (principal - (principal * (m - 1) / timeframe))
-
-            payment = ceil(formula)
-            output += f"Month {m}: paid out {payment}\n"
-            balance -= payment
-            paid += payment
-            m += 1
+        payments = differentiated_payments(principal, timeframe, self._interest_rate(interest_rate))
+        period_name = self.convention.period_name.capitalize()
+        output = "".join(f"{period_name} {m}: paid out {payment}\n" for m, payment in enumerate(payments, 1))
+        overpayment = sum(payments) - principal
+        # The first payment is the largest one.
+        self.values = {'payment': payments[0] if payments else 0, 'overpayment': overpayment, 'term': len(payments)}
 
-        overpayment = paid - principal
-
-        if overpayment > 0:
-            output += f"\nOverpayment = {overpayment}"
-
-        return output
+        return self._format_output(output, overpayment)
 
     def interactive_mode(self):
-        parser_type = Prompt(
-            "Which type of debt would you like to calculate?",
-            Choice('a', 'Annuity'),
-            Choice('d', 'Differentiate')
-        ).prompt()
+        if self.type_prompt is None:
+            self.load_interactive_prompts()
 
-        self.load_interactive_prompts()
+        parser_type = self.type_prompt.prompt()
 
         if parser_type == 'a':
             calc_prompt = self.calc_prompt.prompt()
@@ -279,15 +314,29 @@ class Calculator(object):
 
         return parser_type
 
+    def _read(self, text: str) -> str:
+        """
+        Private function to read an answer through the current reader, so it can be swapped after the prompts are built.
+        """
+        return (self.reader or input)(text)
+
     def load_interactive_prompts(self):
+        self.type_prompt = Prompt(
+            "Which type of debt would you like to calculate?",
+            Choice('a', 'Annuity'),
+            Choice('d', 'Differentiate'),
+            reader=self._read
+        )
+
         self.calc_prompt = Prompt(
             "What do you want to calculate?",
             Choice('n', 'Timeframe to payoff'),
             Choice('a', 'Monthly payment'),
-            Choice('p', 'Credit principal')
+            Choice('p', 'Credit principal'),
+            reader=self._read
         )
 
-        self.principal_prompt = Prompt("Please enter the credit principal")
-        self.payment_prompt = Prompt("Please enter the monthly payment")
-        self.timeframe_prompt = Prompt("Please enter the number of pay cycles")
-        self.interest_prompt = Prompt("Please enter the credit interest rate")
+        self.principal_prompt = Prompt("Please enter the credit principal", reader=self._read)
+        self.payment_prompt = Prompt("Please enter the monthly payment", reader=self._read)
+        self.timeframe_prompt = Prompt("Please enter the number of pay cycles", reader=self._read)
+        self.interest_prompt = Prompt("Please enter the credit interest rate", reader=self._read)
@@ -0,0 +1,413 @@
+import argparse
+import random
+import sys
+from itertools import islice
+from itertools import product
+from math import ceil
+from math import log
+from math import pow
+from time import perf_counter
+from typing import Callable
+from typing import Iterator
+from typing import List
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.conventions import Convention
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.conventions import annuity_payments
+from credit_calculator.conventions import annuity_principals
+from credit_calculator.conventions import annuity_timeframes
+from credit_calculator.conventions import get_convention
+from credit_calculator.helpers.schedule_helper import differentiated_payments
+from credit_calculator.schedule_archive import ScheduleRecord
+
+CONVENTIONS = (MONTHLY, get_convention('biweekly'), get_convention('weekly', 'monthly'), get_convention('quarterly'))
+
+# Edge cases come first in every run: the smallest and largest values, and rates where rounding is most fragile.
+EDGE_PRINCIPALS = (0, 1, 2, 99, 1000000000)
+EDGE_PERIODS = (1, 2, 12, 600)
+EDGE_RATES = (0, 0.01, 0.1, 7.8, 100)
+
+
+def random_loans(seed: int = 0) -> Iterator[tuple]:
+    """
+    Endless stream of loans, edge cases first, then random ones.
+
+    :param seed: Random seed, the same seed always gives the same loans
+    :return: (principal, periods, interest rate as a percentage, convention) for each loan
+    """
+    yield from product(EDGE_PRINCIPALS, EDGE_PERIODS, EDGE_RATES, CONVENTIONS)
+
+    generator = random.Random(seed)
+
+    while True:
+        principal = int(10 ** generator.uniform(0, 9))
+        periods = generator.randint(1, 600)
+        interest = round(generator.uniform(0.01, 40), generator.choice([0, 1, 2]))
+
+        yield principal, periods, max(interest, 0.01), generator.choice(CONVENTIONS)
+
+
+class Check:
+    def __init__(self, name: str, prepare: Callable, reference: Callable, fast: Callable, calculator: Callable = None,
+                 round_trip: bool = False, zero_interest_rule: bool = False):
+        """
+        A fast path and the Calculator method behind it, both checked against an independent reference.
+
+        :param name: Check name
+        :param prepare: Turns a random loan into the arguments for every path, the interest rate is always the third one
+        :param reference: Value and output text of the original, uncached formula for one set of arguments
+        :param fast: Values of the fast path for a list of arguments
+        :param calculator: Value and output text of the Calculator method for one set of arguments, if it is checked
+        :param round_trip: The fast path is a round trip through storage rather than a faster engine, so it is only
+                           checked for exactness and no speedup is reported
+        :param zero_interest_rule: At 0% the original formula divides by zero, and the reference uses the straight
+                                   installment rule the calculator follows instead.  Loans at 0% are counted in the report.
+        """
+        self.name = name
+        self.prepare = prepare
+        self.reference = reference
+        self.fast = fast
+        self.calculator = calculator
+        self.round_trip = round_trip
+        self.zero_interest_rule = zero_interest_rule
+
+
+class Mismatch:
+    def __init__(self, path: str, arguments: tuple, expected, actual):
+        self.path = path
+        self.arguments = arguments
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self):
+        return f"Mismatch({self.path}, {self.arguments}, expected={self.expected!r}, actual={self.actual!r})"
+
+
+class ConformanceReport:
+    def __init__(self, name: str, round_trip: bool = False):
+        """
+        Outcome of one check.
+
+        :param name: Check name
+        :param round_trip: The fast path is a round trip through storage, see Check
+        """
+        self.name = name
+        self.round_trip = round_trip
+        self.zero_interest = 0
+        self.checked = 0
+        self.mismatch_count = 0
+        self.mismatches: List[Mismatch] = []
+        self.reference_seconds = 0.0
+        self.calculator_seconds = 0.0
+        self.fast_seconds = 0.0
+
+    @property
+    def speedup(self) -> float:
+        """
+        How many times faster the fast path is than the original formula.
+        """
+        return self.reference_seconds / self.fast_seconds if self.fast_seconds else float('inf')
+
+    def __str__(self):
+        status = "OK" if self.mismatch_count == 0 else f"{self.mismatch_count} MISMATCHES"
+        output = (f"{self.name}: {self.checked} loans, {status}, reference {self.reference_seconds:.3f}s, "
+                  f"calculator {self.calculator_seconds:.3f}s, ")
+
+        if self.round_trip:
+            output += f"archive round-trip {self.fast_seconds:.3f}s"
+        else:
+            output += f"fast {self.fast_seconds:.3f}s, {self.speedup:.1f}x"
+
+        if self.zero_interest:
+            output += (f"\n  {self.zero_interest} loans at 0% interest are paid in straight installments, "
+                       f"where the original formula divides by zero")
+
+        for mismatch in self.mismatches:
+            output += f"\n  {mismatch}"
+
+        return output
+
+
+# One reference calculator per convention, built here so building them is never timed.
+_calculators = {convention: Calculator(convention) for convention in CONVENTIONS}
+
+
+def _calculator_result(method: str, key: str) -> Callable:
+    """
+    Private function to build a check that runs a Calculator method and picks one of its values along with the output.
+    """
+    def calculated(arguments: tuple):
+        *values, convention = arguments
+        calculator = _calculators[convention]
+        output = getattr(calculator, method)(*values)
+
+        return calculator.values[key], output
+
+    return calculated
+
+
+def _calculator_schedule(arguments: tuple):
+    """
+    Private function for the payments and output of Calculator.differentiate_payment.
+    """
+    principal, periods, interest, convention = arguments
+    output = _calculators[convention].differentiate_payment(principal, periods, interest)
+
+    return [int(line.rsplit(' ', 1)[1]) for line in output.splitlines() if ': paid out ' in line], output
+
+
+# The references below are the calculator formulas as they were before any caching or batching, so a bug in the shared
+# factor tables can't hide in both sides of a check.  Convention._periodic_rate is the uncached rate conversion.  The
+# one deliberate change is 0% interest, where the original formulas divided by zero, see Check.
+def _reference_factor(interest_rate: float, periods: int, convention: Convention) -> float:
+    """
+    Private function for the annuity payment per unit of principal, recomputed on every call.
+    """
+    i = convention._periodic_rate(interest_rate)
+
+    if i == 0:
+        return 1 / periods
+    power = pow(1 + i, periods)
+    numerator = i * power
+    denominator = power - 1
+
+    return numerator / denominator
+
+
+def _reference_output(output: str, overpayment: int) -> str:
+    if overpayment > 0:
+        output += f"\nOverpayment = {overpayment}"
+
+    return output
+
+
+def _reference_payment(arguments: tuple):
+    principal, periods, interest, convention = arguments
+    payment = ceil(principal * _reference_factor(interest, periods, convention))
+
+    return payment, _reference_output(f"Your annuity payment = {payment}!", payment * periods - principal)
+
+
+def _reference_principal(arguments: tuple):
+    payment, periods, interest, convention = arguments
+    principal = round(payment / _reference_factor(interest, periods, convention))
+
+    return principal, _reference_output(f"Your credit principal = {principal}!", payment * periods - principal)
+
+
+def _reference_timeframe(arguments: tuple):
+    principal, payment, interest_rate, convention = arguments
+    interest = convention._periodic_rate(interest_rate)
+
+    if interest == 0:
+        pay_periods = ceil(principal / payment)
+    else:
+        pay_periods = ceil(log(payment / (payment - interest * principal), 1 + interest))
+    years, periods = divmod(pay_periods, convention.payments_per_year)
+    output = "You need "
+
+    if years > 0:
+        output += f"{years} {'year' if years == 1 else 'years'} "
+
+    if periods > 0 and years > 0:
+        output += "and "
+
+    if periods > 0:
+        output += f"{periods} {convention.period_name}{'' if periods == 1 else 's'} "
+
+    output += "to repay this credit!"
+
+    return pay_periods, _reference_output(output, payment * pay_periods - principal)
+
+
+def _reference_schedule(arguments: tuple):
+    principal, timeframe, interest_rate, convention = arguments
+    interest = convention._periodic_rate(interest_rate)
+    period_name = convention.period_name.capitalize()
+    m = 1
+    balance = principal
+    payments = []
+    output = ""
+
+    while balance > 0:
+        payment = ceil((principal / timeframe) + interest * (principal - (principal * (m - 1) / timeframe)))
+        payments.append(payment)
+        output += f"{period_name} {m}: paid out {payment}\n"
+        balance -= payment
+        m += 1
+
+    return payments, _reference_output(output, sum(payments) - principal)
+
+
+def _annuity_payment(loan: tuple) -> int:
+    """
+    Private function for a payment that pays off the loan, so principal and timeframe checks get valid inputs.
+    """
+    principal, periods, interest, convention = loan
+
+    return ceil(principal * _reference_factor(interest, periods, convention))
+
+
+def _archived_schedules(loans: List[tuple]) -> List[List[int]]:
+    """
+    Private function to round-trip schedules through the archive format, which rebuilds them from the loan header.
+    """
+    schedules = []
+
+    for principal, periods, interest, convention in loans:
+        payments = differentiated_payments(principal, periods, convention.periodic_rate(interest))
+        record = ScheduleRecord('', principal, periods, interest, payments, convention)
+        schedules.append(ScheduleRecord.decode(record.encode()).payments)
+
+    return schedules
+
+
+CHECKS = {
+    'annuity_payment': Check(
+        'annuity_payment',
+        lambda loan: loan,
+        _reference_payment,
+        annuity_payments,
+        _calculator_result('annuity_payment', 'payment'),
+        zero_interest_rule=True
+    ),
+    'annuity_principal': Check(
+        'annuity_principal',
+        lambda loan: (_annuity_payment(loan), loan[1], loan[2], loan[3]),
+        _reference_principal,
+        annuity_principals,
+        _calculator_result('annuity_principal', 'principal'),
+        zero_interest_rule=True
+    ),
+    'annuity_timeframe': Check(
+        'annuity_timeframe',
+        lambda loan: (loan[0], _annuity_payment(loan), loan[2], loan[3]),
+        _reference_timeframe,
+        annuity_timeframes,
+        _calculator_result('annuity_timeframe', 'term'),
+        zero_interest_rule=True
+    ),
+    'differentiate_payment': Check(
+        'differentiate_payment',
+        lambda loan: loan,
+        _reference_schedule,
+        _archived_schedules,
+        _calculator_schedule,
+        round_trip=True
+    )
+}
+
+
+def _outcome(func: Callable, *args):
+    """
+    Private function to turn an error into a comparable result, so both paths failing the same way is a match.
+    """
+    try:
+        return func(*args)
+    except Exception as error:
+        return f"raised {type(error).__name__}"
+
+
+def _value(outcome):
+    """
+    Private function for the value of a reference or calculator outcome, without its output text.
+    """
+    return outcome[0] if isinstance(outcome, tuple) else outcome
+
+
+def _compare(report: ConformanceReport, path: str, chunk: List[tuple], expected: list, actual: list,
+             max_mismatches: int) -> None:
+    """
+    Private function to count, and keep the first of, the results of a path that differ from the reference.
+    """
+    for arguments, reference_value, path_value in zip(chunk, expected, actual):
+        if reference_value != path_value:
+            report.mismatch_count += 1
+
+            if len(report.mismatches) < max_mismatches:
+                report.mismatches.append(Mismatch(path, arguments, reference_value, path_value))
+
+
+def run_check(check: Check, count: int, seed: int = 0, chunk_size: int = 10000,
+              max_mismatches: int = 10) -> ConformanceReport:
+    """
+    Compare a fast path and its Calculator method with the reference on the same loans, chunk by chunk, timing each.
+
+    The fast path has to match the reference values, the Calculator method the values and the output text.
+
+    :param check: Check to run
+    :param count: Number of loans
+    :param seed: Random seed
+    :param chunk_size: Loans per fast path call
+    :param max_mismatches: Number of mismatches to keep for the report, all of them are counted
+    :return: Report
+    """
+    report = ConformanceReport(check.name, check.round_trip)
+    path = 'archive round-trip' if check.round_trip else 'fast'
+    loans = islice(random_loans(seed), count)
+
+    while True:
+        chunk = [check.prepare(loan) for loan in islice(loans, chunk_size)]
+
+        if not chunk:
+            break
+
+        start = perf_counter()
+        expected = [_outcome(check.reference, arguments) for arguments in chunk]
+        report.reference_seconds += perf_counter() - start
+
+        start = perf_counter()
+        actual = _outcome(check.fast, chunk)
+        report.fast_seconds += perf_counter() - start
+
+        # If the batch failed as a whole, find out which loans it failed on.
+        if not isinstance(actual, list):
+            actual = [_outcome(lambda arguments: check.fast([arguments])[0], arguments) for arguments in chunk]
+
+        _compare(report, path, chunk, [_value(outcome) for outcome in expected], actual, max_mismatches)
+
+        if check.calculator is not None:
+            start = perf_counter()
+            calculated = [_outcome(check.calculator, arguments) for arguments in chunk]
+            report.calculator_seconds += perf_counter() - start
+
+            _compare(report, 'calculator', chunk, expected, calculated, max_mismatches)
+
+        report.checked += len(chunk)
+
+        if check.zero_interest_rule:
+            report.zero_interest += sum(1 for arguments in chunk if arguments[2] == 0)
+
+    return report
+
+
+def run(count: int, seed: int = 0, checks: List[str] = None, **kwargs) -> List[ConformanceReport]:
+    """
+    Run checks on the same randomized loans.
+
+    :param count: Number of loans per check
+    :param seed: Random seed
+    :param checks: Names of the checks to run, all of them by default
+    :return: Report for each check
+    """
+    return [run_check(CHECKS[name], count, seed, **kwargs) for name in (checks or CHECKS)]
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Check fast calculation paths against the Calculator.')
+    parser.add_argument('--count', type=int, default=100000, help='Loans per check.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    parser.add_argument('--check', action='append', choices=list(CHECKS), help='Check to run, all of them by default.')
+    options = parser.parse_args(args)
+
+    reports = run(options.count, options.seed, options.check)
+
+    for report in reports:
+        print(report)
+
+    return 1 if any(report.mismatch_count for report in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
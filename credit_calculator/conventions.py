@@ -0,0 +1,176 @@
+from functools import lru_cache
+from math import ceil
+from math import log
+from math import pow
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+from credit_calculator.helpers.annuity_helper import annuity_factor
+
+# Periods per year for each supported payment or compounding frequency.
+FREQUENCIES = {
+    'annual': 1,
+    'semiannual': 2,
+    'quarterly': 4,
+    'monthly': 12,
+    'semimonthly': 24,
+    'biweekly': 26,
+    'weekly': 52,
+    'daily': 365
+}
+
+PERIOD_NAMES = {
+    'annual': 'year',
+    'semiannual': 'half-year',
+    'quarterly': 'quarter',
+    'monthly': 'month',
+    'semimonthly': 'half-month',
+    'biweekly': 'fortnight',
+    'weekly': 'week',
+    'daily': 'day'
+}
+
+CACHE_SIZE = 65536
+
+
+class Convention:
+    def __init__(self, payment_frequency: str = 'monthly', compounding_frequency: str = None):
+        """
+        Payment and compounding frequency of a loan.
+
+        Periodic rates, payment factors and growth logs are cached on the convention, so each one is only computed once
+        no matter how many loans share it.  Use get_convention() to share conventions instead of building new ones.
+
+        :param payment_frequency: How often payments are made, one of FREQUENCIES
+        :param compounding_frequency: How often interest compounds, the payment frequency if not given
+        """
+        compounding_frequency = compounding_frequency or payment_frequency
+
+        for frequency in (payment_frequency, compounding_frequency):
+            if frequency not in FREQUENCIES:
+                raise ValueError(f"Unknown frequency '{frequency}', expected one of {', '.join(FREQUENCIES)}")
+
+        self.payment_frequency = payment_frequency
+        self.compounding_frequency = compounding_frequency
+        self.payments_per_year = FREQUENCIES[payment_frequency]
+        self.compounds_per_year = FREQUENCIES[compounding_frequency]
+        self.period_name = PERIOD_NAMES[payment_frequency]
+
+        self.periodic_rate = lru_cache(maxsize=CACHE_SIZE)(self._periodic_rate)
+        self.payment_factor = lru_cache(maxsize=CACHE_SIZE)(self._payment_factor)
+        self.growth_log = lru_cache(maxsize=CACHE_SIZE)(self._growth_log)
+
+    def __repr__(self):
+        return f"Convention({self.payment_frequency!r}, {self.compounding_frequency!r})"
+
+    def _periodic_rate(self, rate: float) -> float:
+        """
+        Private function to turn a yearly percentage into the interest rate per payment period.
+
+        :param rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :return: Interest rate per payment period as a fraction
+        """
+        if self.compounds_per_year == self.payments_per_year:
+            return (rate / self.payments_per_year) / 100
+
+        compounding_rate = (rate / self.compounds_per_year) / 100
+
+        return pow(1 + compounding_rate, self.compounds_per_year / self.payments_per_year) - 1
+
+    def _payment_factor(self, rate: float, periods: int) -> float:
+        """
+        Private function for the annuity payment per unit of principal.
+
+        :param rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :param periods: Number of pay periods
+        :return: Payment per unit of principal
+        """
+        i = self.periodic_rate(rate)
+
+        # Without interest the principal is split evenly, the limit of the annuity factor as the rate goes to zero.
+        if i == 0:
+            return 1 / periods
+
+        return annuity_factor(i, periods)
+
+    def _growth_log(self, rate: float) -> float:
+        """
+        Private function for the natural log of one period's growth, the base of the payoff time logarithm.
+
+        :param rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :return: log(1 + periodic rate)
+        """
+        return log(1 + self.periodic_rate(rate))
+
+
+_conventions: Dict[Tuple[str, str], Convention] = {}
+
+
+def get_convention(payment_frequency: str = 'monthly', compounding_frequency: str = None) -> Convention:
+    """
+    Shared convention for a payment and compounding frequency.
+
+    :param payment_frequency: How often payments are made
+    :param compounding_frequency: How often interest compounds, the payment frequency if not given
+    :return: Convention, built on first use
+    """
+    key = (payment_frequency, compounding_frequency or payment_frequency)
+
+    if key not in _conventions:
+        _conventions[key] = Convention(*key)
+
+    return _conventions[key]
+
+
+MONTHLY = get_convention('monthly')
+
+
+def annuity_payments(loans: Iterable[Tuple[int, int, float, Convention]]) -> List[int]:
+    """
+    Annuity payments for a book of loans with mixed conventions, in one pass.
+
+    Rounded the same way as Calculator.annuity_payment.  Loans sharing a convention, rate and term reuse the same cached
+    payment factor.
+
+    :param loans: (principal, timeframe, interest rate as a percentage, convention) for each loan
+    :return: Payment for each loan
+    """
+    return [ceil(principal * convention.payment_factor(interest_rate, timeframe))
+            for principal, timeframe, interest_rate, convention in loans]
+
+
+def annuity_principals(loans: Iterable[Tuple[int, int, float, Convention]]) -> List[int]:
+    """
+    Annuity principals for a book of loans with mixed conventions, in one pass.
+
+    Rounded the same way as Calculator.annuity_principal.
+
+    :param loans: (payment, timeframe, interest rate as a percentage, convention) for each loan
+    :return: Principal for each loan
+    """
+    return [round(payment / convention.payment_factor(interest_rate, timeframe))
+            for payment, timeframe, interest_rate, convention in loans]
+
+
+def annuity_timeframes(loans: Iterable[Tuple[int, int, float, Convention]]) -> List[int]:
+    """
+    Pay periods to pay off a book of annuity loans with mixed conventions, in one pass.
+
+    Rounded the same way as Calculator.annuity_timeframe.
+
+    :param loans: (principal, payment, interest rate as a percentage, convention) for each loan
+    :return: Pay periods for each loan
+    """
+    timeframes = []
+
+    for principal, payment, interest_rate, convention in loans:
+        interest = convention.periodic_rate(interest_rate)
+
+        if interest == 0:
+            timeframes.append(ceil(principal / payment))
+        else:
+            timeframes.append(ceil(log(payment / (payment - interest * principal)) / convention.growth_log(interest_rate)))
+
+    return timeframes
@@ -0,0 +1,27 @@
+from math import pow
+
+
+def discount_factor(rate: float, periods: float) -> float:
+    """
+    Present value of 1 paid after the given number of periods.
+
+    :param rate: Periodic interest rate as a fraction, e.g. 1% a month is 0.01
+    :param periods: Number of periods, may be fractional
+    :return: Discount factor
+    """
+    return pow(1 + rate, -periods)
+
+
+def annuity_factor(rate: float, periods: int) -> float:
+    """
+    Level payment per unit of principal for an annuity.
+
+    :param rate: Periodic interest rate as a fraction, e.g. 1% a month is 0.01
+    :param periods: Number of pay periods
+    :return: Payment per unit of principal
+    """
+    power = pow(1 + rate, periods)
+    numerator = rate * power
+    denominator = power - 1
+
+    return numerator / denominator
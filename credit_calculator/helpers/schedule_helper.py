@@ -0,0 +1,26 @@
+from math import ceil
+from typing import List
+
+
+def differentiated_payments(principal: int, timeframe: int, interest: float) -> List[int]:
+    """
+    Payments of a differentiated loan, one per pay period, until the principal has been paid out.
+
+    :param principal: Loan principal
+    :param timeframe: Pay periods
+    :param interest: Interest rate per pay period as a fraction
+    :return: Payment for each pay period
+    """
+    m = 1
+    balance = principal
+    payments = []
+
+    while balance > 0:
+        formula = (principal / timeframe) + interest * (principal - (principal * (m - 1) / timeframe))
+
+        payment = ceil(formula)
+        payments.append(payment)
+        balance -= payment
+        m += 1
+
+    return payments
@@ -0,0 +1,245 @@
+from datetime import date
+from math import ceil
+from typing import Callable
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+from credit_calculator.conventions import Convention
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.helpers.annuity_helper import annuity_factor
+from credit_calculator.helpers.annuity_helper import discount_factor
+
+DAYS_PER_YEAR = 365.0
+LOW_RATES = (-0.99, -0.9, -0.5, -0.1)
+HIGHEST_RATE = 1e6
+ARITHMETIC_ERRORS = (OverflowError, ZeroDivisionError)
+NO_SIGN_CHANGE = 'cash flows do not change sign'
+
+
+class IrrResult:
+    def __init__(self, rate: float, converged: bool, iterations: int, reason: str = ''):
+        """
+        Solution of a single IRR row.
+
+        :param rate: Rate per period (per year for XIRR) as a fraction, or None if no root was bracketed
+        :param converged: True if the solver met the tolerance
+        :param iterations: Newton iterations used
+        :param reason: Why the row did not converge, empty if it did
+        """
+        self.rate = rate
+        self.converged = converged
+        self.iterations = iterations
+        self.reason = reason
+
+    def __repr__(self):
+        return f"IrrResult(rate={self.rate}, converged={self.converged}, iterations={self.iterations})"
+
+
+def _npv(rate: float, times: Sequence[float], amounts: Sequence[float]) -> Tuple[float, float]:
+    """
+    Private function for the net present value of cash flows and its derivative with respect to the rate.
+
+    :param rate: Rate per unit of time as a fraction
+    :param times: Time of each cash flow
+    :param amounts: Amount of each cash flow
+    :return: Net present value and its derivative
+    """
+    value = 0.0
+    slope = 0.0
+
+    for time, amount in zip(times, amounts):
+        discounted = amount * discount_factor(rate, time)
+        value += discounted
+        slope -= time * discounted / (1 + rate)
+
+    return value, slope
+
+
+def _annuity_npv(rate: float, net: float, payment: float, timeframe: int) -> Tuple[float, float]:
+    """
+    Private function for the net present value of a level annuity, less the amount received, and its derivative.
+
+    :param rate: Rate per period as a fraction
+    :param net: Amount received up front
+    :param payment: Level payment
+    :param timeframe: Number of pay periods
+    :return: Net present value and its derivative
+    """
+    if rate == 0:
+        return payment * timeframe - net, -payment * timeframe * (timeframe + 1) / 2
+
+    present_value = payment / annuity_factor(rate, timeframe)
+    slope = (payment * timeframe * discount_factor(rate, timeframe + 1) - present_value) / rate
+
+    return present_value - net, slope
+
+
+def _bracket(npv: Callable, row: tuple, tolerance: float):
+    """
+    Private function to find rates on either side of a sign change in the net present value.
+
+    Very negative rates overflow on long schedules, so the low end starts at the lowest rate that can be evaluated.  The
+    high end grows until the sign changes, or until the net present value overflows.
+
+    :param tolerance: Convergence tolerance on the rate, a low end closer than this to its root is a root
+    :return: (low, value at low, high) and an empty reason, or None and why no sign change was found
+    """
+    low_value = None
+
+    for low in LOW_RATES:
+        try:
+            low_value, low_slope = npv(low, *row)
+            break
+        except ARITHMETIC_ERRORS:
+            continue
+
+    if low_value is None:
+        return None, 'net present value overflows at every low rate'
+
+    # A root at the low end, unless the value is zero at every rate, e.g. with no cash flows.
+    if low_value == 0 or (low_slope != 0 and abs(low_value / low_slope) <= tolerance * max(1.0, abs(low))):
+        if npv(1.0, *row)[0] == 0:
+            return None, NO_SIGN_CHANGE
+
+        return (low, 0.0, low), ''
+
+    high = 1.0
+
+    while high <= HIGHEST_RATE:
+        try:
+            high_value = npv(high, *row)[0]
+        except ARITHMETIC_ERRORS:
+            return None, f"net present value overflows at rate {high} before the sign changes"
+
+        if low_value * high_value <= 0:
+            return (low, low_value, high), ''
+
+        high *= 4
+
+    return None, NO_SIGN_CHANGE
+
+
+def solve(rows: Sequence[tuple], npv: Callable = _npv, guess: float = 0.01, tolerance: float = 1e-10,
+          max_iterations: int = 100) -> List[IrrResult]:
+    """
+    Solve the rate that zeroes the net present value of many cash-flow rows at once.
+
+    Rows are stepped together with a safeguarded Newton method: each row keeps a bracket around its root and falls back to
+    bisection whenever a Newton step leaves the bracket.  Converged rows drop out of the working set.
+
+    :param rows: Arguments to the net present value function for each row, (times, amounts) by default
+    :param npv: Function of (rate, *row) returning the net present value and its derivative
+    :param guess: Starting rate
+    :param tolerance: Convergence tolerance on the rate
+    :param max_iterations: Iteration limit per row
+    :return: Result for each row, in order
+    """
+    results: List[IrrResult] = [None] * len(rows)
+    # Working state per active row: [index, low, value at low, high, rate]
+    active = []
+
+    for index, row in enumerate(rows):
+        bracket, reason = _bracket(npv, row, tolerance)
+
+        if bracket is None:
+            results[index] = IrrResult(None, False, 0, reason)
+        elif bracket[1] == 0:
+            results[index] = IrrResult(bracket[0], True, 0)
+        else:
+            low, low_value, high = bracket
+            rate = guess if low < guess < high else (low + high) / 2
+            active.append([index, low, low_value, high, rate])
+
+    for iteration in range(1, max_iterations + 1):
+        still_active = []
+
+        for state in active:
+            index, low, low_value, high, rate = state
+
+            try:
+                value, slope = npv(rate, *rows[index])
+            except ARITHMETIC_ERRORS:
+                results[index] = IrrResult(rate, False, iteration, f"net present value overflows at rate {rate}")
+                continue
+
+            if value * low_value > 0:
+                low, low_value = rate, value
+            else:
+                high = rate
+
+            if slope != 0 and low < rate - value / slope < high:
+                next_rate = rate - value / slope
+            else:
+                next_rate = (low + high) / 2
+
+            if value == 0 or abs(next_rate - rate) <= tolerance * max(1.0, abs(rate)):
+                results[index] = IrrResult(next_rate, True, iteration)
+            else:
+                still_active.append([index, low, low_value, high, next_rate])
+
+        active = still_active
+
+        if not active:
+            break
+
+    for index, _, _, _, rate in active:
+        results[index] = IrrResult(rate, False, max_iterations, 'iteration limit reached')
+
+    return results
+
+
+def irr(cash_flows: Sequence[Sequence[float]], **kwargs) -> List[IrrResult]:
+    """
+    Internal rate of return per period for rows of evenly spaced cash flows.
+
+    :param cash_flows: Cash flows for each row, the first one at period 0
+    :return: Rate per period for each row
+    """
+    return solve([(range(len(flows)), flows) for flows in cash_flows], **kwargs)
+
+
+def xirr(cash_flows: Sequence[Sequence[Tuple[date, float]]], **kwargs) -> List[IrrResult]:
+    """
+    Annual internal rate of return for rows of dated, irregular cash flows, e.g. schedules with prepayments.
+
+    :param cash_flows: (date, amount) pairs for each row
+    :return: Annual rate for each row
+    """
+    rows = []
+
+    for flows in cash_flows:
+        start = min(when for when, _ in flows) if flows else None
+        times = [(when - start).days / DAYS_PER_YEAR for when, _ in flows]
+        rows.append((times, [amount for _, amount in flows]))
+
+    kwargs.setdefault('guess', 0.1)
+
+    return solve(rows, **kwargs)
+
+
+def annual_percentage_rate(loans: Sequence[Tuple[int, int, float, float]], convention: Convention = MONTHLY,
+                           **kwargs) -> List[IrrResult]:
+    """
+    Fee-inclusive APR for many annuity loans.
+
+    The payment is the annuity payment the calculator would quote, and the borrower only receives the principal minus
+    fees, so the rate is solved over the net amount.  Level payments are discounted in closed form with the annuity factor.
+
+    :param loans: (principal, timeframe, interest rate as a percentage, fees) for each loan
+    :param convention: Payment and compounding frequency of the loans
+    :return: APR for each loan as a percentage, e.g. 12% is 12
+    """
+    rows = []
+
+    for principal, timeframe, interest_rate, fees in loans:
+        payment = ceil(principal * convention.payment_factor(interest_rate, timeframe))
+        rows.append((principal - fees, payment, timeframe))
+
+    results = solve(rows, npv=_annuity_npv, **kwargs)
+
+    for result in results:
+        if result.rate is not None:
+            result.rate = result.rate * convention.payments_per_year * 100
+
+    return results
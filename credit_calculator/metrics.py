@@ -0,0 +1,278 @@
+import json
+import threading
+from functools import wraps
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+from typing import Dict
+from typing import Tuple
+
+METRIC_PREFIX = "credit_calculator"
+
+# Upper bounds in seconds.  Calculator operations are sub-millisecond, so the buckets are skewed towards the low end.
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# Set on an error once it has been counted, so operations it propagates through don't count it again.
+COUNTED_ATTRIBUTE = '_credit_calculator_counted'
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Latency histogram with fixed bucket upper bounds.
+
+        :param buckets: Sorted bucket upper bounds in seconds
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a single observation.
+
+        :param value: Observed duration in seconds
+        """
+        self.count += 1
+        self.sum += value
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative_counts(self) -> list:
+        """
+        Bucket counts as cumulative totals, the way Prometheus expects them.
+
+        :return: Cumulative count for each bucket
+        """
+        total = 0
+        cumulative = []
+
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+
+        return cumulative
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Registry of per-operation call counts, latencies and error counts.
+
+        Instrumentation is disabled by default.  While disabled, instrumented functions skip all bookkeeping.
+        """
+        self.enabled = False
+        self.calls: Dict[str, int] = {}
+        self.latencies: Dict[str, Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Drop everything recorded so far.
+        """
+        with self._lock:
+            self.calls.clear()
+            self.latencies.clear()
+            self.errors.clear()
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """
+        Record a call to an operation and how long it took.
+
+        :param operation: Operation name
+        :param seconds: Duration of the call in seconds
+        """
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+            if operation not in self.latencies:
+                self.latencies[operation] = Histogram()
+
+            self.latencies[operation].observe(seconds)
+
+    def count_error(self, operation: str, error: Exception) -> None:
+        """
+        Record an error raised by an operation, keyed by the error's type name.
+
+        :param operation: Operation name
+        :param error: Error that was raised
+        """
+        if not self.enabled:
+            return
+
+        key = (operation, type(error).__name__)
+
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        """
+        Take a JSON-serializable snapshot of all metrics.
+
+        :return: Dictionary of calls, latencies and errors per operation
+        """
+        with self._lock:
+            operations = {}
+            names = set(self.calls) | {operation for operation, _ in self.errors}
+
+            # Every operation has the same keys, even one that has only recorded errors so far.
+            for operation in names:
+                histogram = self.latencies.get(operation) or Histogram()
+                operations[operation] = {
+                    'calls': self.calls.get(operation, 0),
+                    'latency_seconds': {
+                        'sum': histogram.sum,
+                        'count': histogram.count,
+                        'buckets': dict(zip([str(bound) for bound in histogram.buckets],
+                                            histogram.cumulative_counts()))
+                    },
+                    'errors': {}
+                }
+
+            for (operation, error), count in self.errors.items():
+                operations[operation]['errors'][error] = count
+
+            return {'operations': operations}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        :return: Prometheus metrics text
+        """
+        with self._lock:
+            lines = [
+                f"# HELP {METRIC_PREFIX}_calls_total Calls per operation.",
+                f"# TYPE {METRIC_PREFIX}_calls_total counter"
+            ]
+
+            for operation, calls in sorted(self.calls.items()):
+                lines.append(f'{METRIC_PREFIX}_calls_total{{operation="{operation}"}} {calls}')
+
+            lines.append(f"# HELP {METRIC_PREFIX}_errors_total Errors per operation and error type.")
+            lines.append(f"# TYPE {METRIC_PREFIX}_errors_total counter")
+
+            for (operation, error), count in sorted(self.errors.items()):
+                lines.append(f'{METRIC_PREFIX}_errors_total{{operation="{operation}",error="{error}"}} {count}')
+
+            lines.append(f"# HELP {METRIC_PREFIX}_duration_seconds Latency per operation.")
+            lines.append(f"# TYPE {METRIC_PREFIX}_duration_seconds histogram")
+
+            for operation, histogram in sorted(self.latencies.items()):
+                name = f"{METRIC_PREFIX}_duration_seconds"
+
+                for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                    lines.append(f'{name}_bucket{{operation="{operation}",le="{bound}"}} {count}')
+
+                lines.append(f'{name}_bucket{{operation="{operation}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{operation="{operation}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{operation="{operation}"}} {histogram.count}')
+
+            return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """
+        Write metrics to a file.  Paths ending in '.json' get a JSON snapshot, anything else gets Prometheus text.
+
+        :param path: Path to write the metrics to
+        """
+        path = Path(path)
+
+        if path.suffix == '.json':
+            path.write_text(self.to_json())
+        else:
+            path.write_text(self.to_prometheus())
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> HTTPServer:
+        """
+        Serve metrics over HTTP from a background thread.
+
+        '/metrics' returns Prometheus text and '/metrics.json' returns a JSON snapshot.
+
+        :param port: Port to listen on, 0 picks a free port
+        :param host: Interface to bind to, local only by default
+        :return: The running server.  Call shutdown() on it to stop serving.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = registry.to_prometheus()
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body = registry.to_json()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        return server
+
+
+# Process-wide registry used by the calculator.
+metrics = Metrics()
+
+
+def instrument(operation: str) -> Callable:
+    """
+    Decorator recording calls, latency and errors of a function under the given operation name.
+
+    When the registry is disabled the wrapped function is called straight through.  An error is counted once, under the
+    innermost instrumented operation it went through, so error totals can be summed across operations.
+
+    :param operation: Operation name to record under
+    :return: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+
+            start = perf_counter()
+
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                if not getattr(error, COUNTED_ATTRIBUTE, False):
+                    metrics.count_error(operation, error)
+                    setattr(error, COUNTED_ATTRIBUTE, True)
+
+                raise
+            finally:
+                metrics.observe(operation, perf_counter() - start)
+
+        return wrapper
+
+    return decorator
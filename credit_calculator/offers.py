@@ -0,0 +1,147 @@
+import heapq
+from itertools import islice
+from math import ceil
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+from credit_calculator.conventions import Convention
+from credit_calculator.conventions import MONTHLY
+
+RANK_BY = ('payment', 'overpayment')
+
+
+class Offer:
+    def __init__(self, lender: str, interest: float, periods: int, fees: int = 0, convention: Convention = MONTHLY):
+        """
+        A lender's offer for a loan.
+
+        :param lender: Lender name or offer ID
+        :param interest: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :param periods: Pay periods, usually the term of the loan in months
+        :param fees: Up-front fees, counted as overpayment
+        :param convention: Payment and compounding frequency
+        """
+        self.lender = lender
+        self.interest = interest
+        self.periods = periods
+        self.fees = fees
+        self.convention = convention
+
+    def __repr__(self):
+        return f"Offer({self.lender!r}, {self.interest}, {self.periods}, {self.fees})"
+
+
+def offer_payment(principal: int, offer: Offer) -> int:
+    """
+    Annuity payment for an offer, rounded the same way as Calculator.annuity_payment.
+
+    :param principal: Loan principal
+    :param offer: Offer to price
+    :return: Payment per period
+    """
+    return ceil(principal * offer.convention.payment_factor(offer.interest, offer.periods))
+
+
+class _InterestWeights(dict):
+    def __init__(self, principal: int):
+        """
+        Lower bound on the interest per period on a principal, per unit of yearly rate, for each convention.
+
+        When interest compounds at least as often as payments are made, the periodic rate is at least the yearly rate
+        split evenly between payments.  Otherwise no bound is used.
+
+        :param principal: Loan principal
+        """
+        super().__init__()
+        self.principal = principal
+
+    def __missing__(self, convention: Convention) -> float:
+        if convention.compounds_per_year >= convention.payments_per_year:
+            weight = self.principal / convention.payments_per_year / 100
+        else:
+            weight = 0.0
+
+        self[convention] = weight
+
+        return weight
+
+
+def _screen(principal: int, offers: List[Offer], rank_by: str, threshold: float, weights: _InterestWeights) -> List[Offer]:
+    """
+    Private function to drop offers whose lower bound can't reach a ranking value, with no function call per offer.
+
+    An annuity payment is at least the interest-only payment and at least the zero-interest payment.  Its balance never
+    falls faster than straight-line amortization, so the interest paid is at least the straight-line interest.
+
+    :return: Offers that might reach the threshold, in order
+    """
+    # Leave room for rounding in the bounds.
+    threshold *= 1 + 1e-9
+
+    if rank_by == 'payment':
+        return [offer for offer in offers
+                if offer.interest * weights[offer.convention] <= threshold and principal <= threshold * offer.periods]
+
+    return [offer for offer in offers
+            if offer.fees + offer.interest * weights[offer.convention] * (offer.periods + 1) / 2 <= threshold]
+
+
+def best_offers(principal: int, offers: Iterable[Offer], k: int = 10, rank_by: str = 'payment',
+                chunk_size: int = 4096) -> List[Tuple[int, Offer]]:
+    """
+    Find the k best offers for a principal, cheapest first.
+
+    Offers are evaluated in chunks.  Once k offers have been found, each chunk is first screened with lower bounds that
+    only take a comparison or two per offer, and only offers whose bound can still reach the current k-th best are
+    priced exactly.  The k best are kept in a bounded heap, so the offers are never sorted as a whole.  Ties go to the
+    offer that came first.
+
+    :param principal: Loan principal
+    :param offers: Offers to rank
+    :param k: Number of offers to return
+    :param rank_by: 'payment' for the monthly payment or 'overpayment' for the total overpayment including fees
+    :param chunk_size: Largest number of offers screened at a time
+    :return: (ranking value, offer) pairs, best first
+    """
+    if rank_by not in RANK_BY:
+        raise ValueError(f"Cannot rank by '{rank_by}', expected one of {', '.join(RANK_BY)}")
+
+    if k <= 0:
+        return []
+
+    # Max-heap on (value, position) through negation, so heap[0] is the current k-th best.
+    heap = []
+    # Offers are priced in order, so a running count is enough to break ties, even with screened offers left out.
+    position = 0
+    weights = _InterestWeights(principal)
+    offers = iter(offers)
+
+    while True:
+        # Take just enough offers to fill the heap, then chunks that grow up to chunk_size, so the screen gets a tight
+        # threshold early on.
+        size = k - len(heap) if len(heap) < k else min(chunk_size, max(k, position))
+        chunk = list(islice(offers, size))
+
+        if not chunk:
+            break
+
+        if len(heap) == k:
+            chunk = _screen(principal, chunk, rank_by, -heap[0][0], weights)
+
+        for offer in chunk:
+            position += 1
+            payment = offer_payment(principal, offer)
+
+            if rank_by == 'payment':
+                value = payment
+            else:
+                value = payment * offer.periods - principal + offer.fees
+
+            # A later offer loses ties, so it has to be strictly cheaper than the k-th best.
+            if len(heap) < k:
+                heapq.heappush(heap, (-value, -position, offer))
+            elif value < -heap[0][0]:
+                heapq.heapreplace(heap, (-value, -position, offer))
+
+    return [(-value, offer) for value, _, offer in sorted(heap, reverse=True)]
@@ -0,0 +1,218 @@
+import csv
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict
+from typing import List
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.calculator import ERR_INCORRECT_PARAMETERS
+from credit_calculator.conventions import FREQUENCIES
+from credit_calculator.summary import BatchSummary
+
+ID_FIELD = 'loan_id'
+FIELDS = ('type', 'principal', 'periods', 'interest', 'payment', 'frequency', 'compounding')
+NUMERIC_FIELDS = {'principal': int, 'periods': int, 'interest': float, 'payment': int}
+CHOICE_FIELDS = {'type': ('annuity', 'diff'), 'frequency': tuple(FREQUENCIES), 'compounding': tuple(FREQUENCIES)}
+
+STATUS_NEW = 'new'
+STATUS_CHANGED = 'changed'
+STATUS_DELETED = 'deleted'
+
+
+def read_loans(path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Read a loan file.
+
+    The file is a CSV with a 'loan_id' column and any of the 'type', 'principal', 'periods', 'interest', 'payment',
+    'frequency' and 'compounding' columns.  Blank cells are missing values, the same as leaving the option off the command
+    line.  Type and frequencies are case-insensitive, as in interactive mode.  Cells are not checked here, so one bad
+    row can't stop the rest of the file from being valued, see check_loan().
+
+    :param path: CSV file to read
+    :return: Inputs for each loan, by loan ID
+    """
+    loans = {}
+
+    with open(path, newline='') as file:
+        reader = csv.DictReader(file)
+
+        if reader.fieldnames is None or ID_FIELD not in reader.fieldnames:
+            raise ValueError(f"{path} has no '{ID_FIELD}' column")
+
+        for row in reader:
+            loan_id = row[ID_FIELD]
+
+            if loan_id in loans:
+                raise ValueError(f"Loan '{loan_id}' appears more than once in {path}")
+
+            inputs = {field: (row.get(field) or '').strip() for field in FIELDS}
+
+            for field in CHOICE_FIELDS:
+                inputs[field] = inputs[field].lower()
+
+            loans[loan_id] = inputs
+
+    return loans
+
+
+def check_loan(inputs: Dict[str, str]) -> None:
+    """
+    Check that a loan's numeric cells are numbers and its type and frequencies are known.
+
+    :param inputs: Loan inputs
+    :raises ValueError: If a cell is invalid
+    """
+    for field, convert in NUMERIC_FIELDS.items():
+        if inputs[field]:
+            try:
+                convert(inputs[field])
+            except ValueError:
+                raise ValueError(f"non-numeric {field}: {inputs[field]!r}")
+
+    for field, choices in CHOICE_FIELDS.items():
+        if inputs[field] and inputs[field] not in choices:
+            raise ValueError(f"unknown {field}: {inputs[field]!r}, expected one of {', '.join(choices)}")
+
+
+def loan_hash(inputs: Dict[str, str]) -> str:
+    """
+    Content hash of a loan's inputs.
+
+    :param inputs: Loan inputs
+    :return: Hex digest that changes whenever any input changes
+    """
+    content = "\x1f".join(f"{field}={inputs.get(field, '')}" for field in FIELDS)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def loan_arguments(inputs: Dict[str, str]) -> List[str]:
+    """
+    Turn a loan's inputs into calculator arguments.
+
+    :param inputs: Loan inputs
+    :return: Arguments for Calculator.calculate
+    """
+    args = []
+
+    for field in FIELDS:
+        if inputs.get(field):
+            args += [f"--{field}", inputs[field]]
+
+    return args
+
+
+def load_snapshot(path: Path) -> Dict[str, dict]:
+    """
+    Load a revaluation snapshot.  A missing snapshot is an empty one, so the first run values every loan.
+
+    :param path: Snapshot file
+    :return: Snapshot entry ('hash', 'inputs', 'result', 'values' and 'error' if it failed) for each loan, by loan ID
+    """
+    path = Path(path)
+
+    if not path.exists():
+        return {}
+
+    return json.loads(path.read_text())['loans']
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    """
+    Private function to replace a file without leaving it half-written if the run dies.
+    """
+    path = Path(path)
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_text(text)
+    os.replace(temporary, path)
+
+
+def _calculate(calculator: Calculator, inputs: Dict[str, str]):
+    """
+    Private function to value one loan, turning invalid inputs or a calculation that fails into an error for that loan
+    alone.
+
+    :return: Result, calculator values and error, the result and values are None if there is an error
+    """
+    try:
+        check_loan(inputs)
+        args = loan_arguments(inputs)
+
+        # No arguments at all would drop the calculator into interactive mode.
+        if not args:
+            return ERR_INCORRECT_PARAMETERS, None, None
+
+        return calculator.calculate(args), calculator.values, None
+    except (SystemExit, ValueError, ArithmeticError) as error:
+        return None, None, f"{type(error).__name__}: {error}"
+
+
+class Revaluation:
+    def __init__(self):
+        """
+        Outcome of a revaluation run.
+        """
+        self.new: List[str] = []
+        self.changed: List[str] = []
+        self.deleted: List[str] = []
+        self.unchanged = 0
+
+    def summary(self) -> str:
+        return (f"Revalued {len(self.new) + len(self.changed)} loans: {len(self.new)} new, {len(self.changed)} changed, "
+                f"{len(self.deleted)} deleted, {self.unchanged} unchanged")
+
+
+def revalue(loans_path: Path, snapshot_path: Path, delta_path: Path, summary: BatchSummary = None) -> Revaluation:
+    """
+    Revalue a loan file against the previous snapshot, running only new and changed loans through the calculator.
+
+    Writes a delta file with one JSON line per new, changed or deleted loan, then replaces the snapshot.  A loan the
+    calculator can't value, because of an invalid cell or a calculation that fails, gets an 'error' instead of a result,
+    and the rest of the run carries on.
+
+    :param loans_path: Current loan file
+    :param snapshot_path: Snapshot from the previous run, created if missing
+    :param delta_path: Where to write the delta
+    :param summary: If given, every loan in the file, changed or not, is added to it
+    :return: Outcome of the run
+    """
+    loans = read_loans(loans_path)
+    previous = load_snapshot(snapshot_path)
+    snapshot = {}
+    deltas = []
+    revaluation = Revaluation()
+    calculator = Calculator()
+
+    for loan_id, inputs in loans.items():
+        digest = loan_hash(inputs)
+        entry = previous.get(loan_id)
+
+        if entry is not None and entry['hash'] == digest:
+            snapshot[loan_id] = entry
+            revaluation.unchanged += 1
+        else:
+            status = STATUS_NEW if entry is None else STATUS_CHANGED
+            result, values, error = _calculate(calculator, inputs)
+            snapshot[loan_id] = {'hash': digest, 'inputs': inputs, 'result': result, 'values': values}
+            delta = {'loan_id': loan_id, 'status': status, 'result': result}
+
+            if error is not None:
+                snapshot[loan_id]['error'] = delta['error'] = error
+
+            deltas.append(delta)
+            getattr(revaluation, status).append(loan_id)
+
+        if summary is not None and snapshot[loan_id].get('values') is not None:
+            summary.add(inputs['type'], snapshot[loan_id]['values'])
+
+    for loan_id in previous:
+        if loan_id not in loans:
+            deltas.append({'loan_id': loan_id, 'status': STATUS_DELETED, 'result': None})
+            revaluation.deleted.append(loan_id)
+
+    _write_atomically(delta_path, "".join(json.dumps(delta) + "\n" for delta in deltas))
+    _write_atomically(snapshot_path, json.dumps({'loans': snapshot}))
+
+    return revaluation
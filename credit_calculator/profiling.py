@@ -0,0 +1,220 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import TextIO
+from typing import Tuple
+
+PROFILERS = ('cprofile', 'sampling')
+
+# Only functions defined in this package count towards the hot-path summary.
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_label(filename: str, line: int, name: str) -> str:
+    """
+    Private function to label a stack frame for collapsed-stack output.
+
+    :param filename: Source file of the frame
+    :param line: First line of the function
+    :param name: Function name
+    :return: Frame label without the characters the collapsed format reserves
+    """
+    label = f"{name} ({os.path.basename(filename)}:{line})"
+
+    return label.replace(';', ':').replace(' ', '_')
+
+
+def _in_package(filename: str) -> bool:
+    return os.path.abspath(filename).startswith(PACKAGE_DIR)
+
+
+class Profile:
+    def __init__(self, profiler: str = 'cprofile', interval: float = 0.001):
+        """
+        Profile of a single calculator run.
+
+        :param profiler: 'cprofile' for deterministic profiling, 'sampling' for a low-overhead stack sampler
+        :param interval: Seconds between samples, sampling profiler only
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {', '.join(PROFILERS)}")
+
+        self.profiler = profiler
+        self.interval = interval
+        self.stats: pstats.Stats = None
+        self.samples: Counter = Counter()
+        self.package_frames = set()
+
+    def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a function under the profiler.
+
+        :param func: Function to profile
+        :return: Whatever the function returns
+        """
+        if self.profiler == 'cprofile':
+            return self._run_cprofile(func, *args, **kwargs)
+        else:
+            return self._run_sampling(func, *args, **kwargs)
+
+    def _run_cprofile(self, func: Callable, *args, **kwargs):
+        profile = cProfile.Profile()
+
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            self.stats = pstats.Stats(profile, stream=sys.stderr)
+
+    def _run_sampling(self, func: Callable, *args, **kwargs):
+        target = threading.get_ident()
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                stack = []
+
+                while frame is not None:
+                    code = frame.f_code
+                    label = _frame_label(code.co_filename, code.co_firstlineno, code.co_name)
+                    stack.append(label)
+
+                    if _in_package(code.co_filename):
+                        self.package_frames.add(label)
+
+                    frame = frame.f_back
+
+                if stack:
+                    self.samples[';'.join(reversed(stack))] += 1
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            done.set()
+            sampler.join()
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """
+        Collapsed stacks ("frame;frame;frame" -> weight) for flamegraph tools.
+
+        Sampled runs are weighted by sample count.  cProfile runs are weighted by self time in microseconds, with stacks
+        rebuilt from caller/callee edges, so time is split between call paths in proportion to each path's share.
+
+        :return: Weight per collapsed stack
+        """
+        if self.profiler == 'sampling':
+            return dict(self.samples)
+
+        stacks: Dict[str, int] = Counter()
+        entries = self.stats.stats
+        callees: Dict[Tuple, Dict[Tuple, tuple]] = {}
+
+        for func, (_, _, _, _, callers) in entries.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, {})[func] = edge
+
+        def walk(func: Tuple, path: List[str], share: float):
+            self_time = entries[func][2]
+            path = path + [_frame_label(*func)]
+            weight = int(self_time * share * 1000000)
+
+            if weight > 0:
+                stacks[';'.join(path)] += weight
+
+            for callee, edge in callees.get(func, {}).items():
+                callee_cumulative = entries[callee][3]
+
+                if _frame_label(*callee) in path or callee_cumulative <= 0:
+                    continue
+
+                walk(callee, path, share * min(1.0, edge[3] / callee_cumulative))
+
+        for func, (_, _, _, _, callers) in entries.items():
+            if not callers:
+                walk(func, [], 1.0)
+
+        return dict(stacks)
+
+    def hot_functions(self, top: int = 10) -> List[Tuple[str, float, float, int]]:
+        """
+        Hottest calculator functions, by self time or sample count.
+
+        :param top: Number of functions to return
+        :return: (function, self weight, cumulative weight, calls) for each function, hottest first
+        """
+        hot = []
+
+        if self.profiler == 'cprofile':
+            for (filename, line, name), (_, calls, self_time, cumulative, _) in self.stats.stats.items():
+                if _in_package(filename):
+                    hot.append((_frame_label(filename, line, name), self_time, cumulative, calls))
+        else:
+            self_counts: Counter = Counter()
+            cumulative_counts: Counter = Counter()
+
+            for stack, count in self.samples.items():
+                frames = stack.split(';')
+                self_counts[frames[-1]] += count
+
+                for frame in set(frames):
+                    cumulative_counts[frame] += count
+
+            for frame, cumulative in cumulative_counts.items():
+                if frame in self.package_frames:
+                    hot.append((frame, self_counts[frame], cumulative, 0))
+
+        hot.sort(key=lambda entry: (entry[1], entry[2]), reverse=True)
+
+        return hot[:top]
+
+    def write(self, prefix: str) -> List[Path]:
+        """
+        Write the profile to disk: '<prefix>.pstats' (cProfile only) and '<prefix>.collapsed'.
+
+        :param prefix: Path prefix for the output files
+        :return: Paths that were written
+        """
+        written = []
+
+        if self.stats is not None:
+            pstats_path = Path(f"{prefix}.pstats")
+            self.stats.dump_stats(str(pstats_path))
+            written.append(pstats_path)
+
+        collapsed_path = Path(f"{prefix}.collapsed")
+        lines = [f"{stack} {weight}" for stack, weight in sorted(self.collapsed_stacks().items())]
+        collapsed_path.write_text("\n".join(lines) + "\n" if lines else "")
+        written.append(collapsed_path)
+
+        return written
+
+    def print_summary(self, top: int = 10, stream: TextIO = None) -> None:
+        """
+        Print the hottest calculator functions.  Goes to stderr so results on stdout are left alone.
+
+        :param top: Number of functions to show
+        :param stream: Stream to print to, stderr by default
+        """
+        stream = stream or sys.stderr
+
+        if self.profiler == 'cprofile':
+            header = f"{'self (s)':>12} {'cumulative (s)':>15} {'calls':>8}  function"
+        else:
+            header = f"{'self':>12} {'cumulative':>15} {'':>8}  function (samples)"
+
+        print(f"Top {top} calculator functions ({self.profiler}):", file=stream)
+        print(header, file=stream)
+
+        for label, self_weight, cumulative, calls in self.hot_functions(top):
+            calls_column = str(calls) if self.profiler == 'cprofile' else ''
+            print(f"{self_weight:>12.6g} {cumulative:>15.6g} {calls_column:>8}  {label}", file=stream)
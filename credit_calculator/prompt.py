@@ -1,28 +1,36 @@
+from typing import Callable
+
 from credit_calculator.choice import Choice
 
 
 class Prompt:
-    def __init__(self, text: str, *choices: Choice):
+    def __init__(self, text: str, *choices: Choice, reader: Callable[[str], str] = None):
         """
         Interactive prompt that allows user interaction.
 
         :param text: Prompt text to display
         :param choices: Choices for the user to pick from
+        :param reader: Function that shows the prompt text and returns the user's answer, input() if not given
         """
         self.text = text
         self.choices = choices
+        self.reader = reader
         self.accepted_values = set()
         self.default_choice: Choice = None
         self.choice: Choice = None
+        self._prompt_text: str = None
 
     def _build_prompt(self) -> str:
         """
-        Build the prompt to display to the user.
+        Build the prompt to display to the user.  The text is only built once, then reused.
 
         :return: Prompt text
         """
-        if self.choices is ():
-            return f"{self.text}: "
+        if self._prompt_text is not None:
+            return self._prompt_text
+
+        if not self.choices:
+            output = f"{self.text}: "
         else:
             output = f"{self.text}\n"
             choice_list = []
@@ -36,7 +44,9 @@ class Prompt:
             choice_text = "\n".join(choice_list)
             output += f"{choice_text}: \n> "
 
-            return output
+        self._prompt_text = output
+
+        return output
 
     def prompt(self) -> str:
         """
@@ -44,7 +54,8 @@ class Prompt:
 
         :return: User's choice as a string if choices were provided to the instance, else the user's input
         """
-        user_input = input(self._build_prompt()).lower()
+        reader = self.reader or input
+        user_input = reader(self._build_prompt()).lower()
 
         if user_input == '' and self.default_choice is not None:
             return self.default_choice.choice
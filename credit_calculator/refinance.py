@@ -0,0 +1,209 @@
+from math import ceil
+from math import pow
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from credit_calculator.conventions import Convention
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.offers import Offer
+
+
+class Loan:
+    def __init__(self, principal: int, periods: int, interest: float, elapsed: int = 0, convention: Convention = MONTHLY):
+        """
+        An existing annuity loan that could be refinanced.
+
+        :param principal: Original loan principal
+        :param periods: Original pay periods
+        :param interest: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :param elapsed: Pay periods already paid
+        :param convention: Payment and compounding frequency
+        """
+        self.principal = principal
+        self.periods = periods
+        self.interest = interest
+        self.elapsed = elapsed
+        self.convention = convention
+        self.payment = ceil(principal * convention.payment_factor(interest, periods))
+
+    def __repr__(self):
+        return f"Loan({self.principal}, {self.periods}, {self.interest}, {self.elapsed})"
+
+
+class RefinanceResult:
+    def __init__(self, offer: Offer, balance: float, payment: int, new_payment: int, break_even: int, savings: int):
+        """
+        Comparison of keeping a loan against refinancing it with an offer.
+
+        :param offer: Refinance offer, its fees are the closing costs
+        :param balance: Balance refinanced
+        :param payment: Current payment
+        :param new_payment: Payment after refinancing
+        :param break_even: Pay periods after refinancing until the closing costs are recovered, None if they never are
+        :param savings: Lifetime savings, negative if refinancing costs more
+        """
+        self.offer = offer
+        self.balance = balance
+        self.payment = payment
+        self.new_payment = new_payment
+        self.break_even = break_even
+        self.savings = savings
+
+    def __repr__(self):
+        return f"RefinanceResult({self.offer!r}, break_even={self.break_even}, savings={self.savings})"
+
+
+def remaining_balance(principal: float, payment: int, rate: float, periods: int) -> float:
+    """
+    Balance left on an annuity loan after some payments.
+
+    :param principal: Principal at the start
+    :param payment: Payment per period
+    :param rate: Interest rate per period as a fraction
+    :param periods: Payments made
+    :return: Remaining balance, never below zero
+    """
+    if rate == 0:
+        return max(0.0, principal - payment * periods)
+
+    growth = pow(1 + rate, periods)
+
+    return max(0.0, principal * growth - payment * (growth - 1) / rate)
+
+
+def _cost_difference(loan: Loan, balance: float, offer: Offer, new_payment: int, period: int) -> float:
+    """
+    Private function for how far ahead refinancing is after some pay periods.
+
+    Each side's cost so far is what has been paid plus what is still owed, with the closing costs on the refinance side.
+
+    :return: Cost of keeping the loan less the cost of refinancing, positive once refinancing has paid off
+    """
+    remaining = loan.periods - loan.elapsed
+    kept_periods = min(period, remaining)
+    kept = kept_periods * loan.payment + remaining_balance(balance, loan.payment,
+                                                           loan.convention.periodic_rate(loan.interest), kept_periods)
+    new_periods = min(period, offer.periods)
+    refinanced = offer.fees + new_periods * new_payment + remaining_balance(
+        balance, new_payment, offer.convention.periodic_rate(offer.interest), new_periods)
+
+    return kept - refinanced
+
+
+def _first_reaching(difference: Callable[[int], float], low: int, high: int) -> Optional[int]:
+    """
+    Private function for the first period in a stretch where the cost difference is not negative.
+
+    The difference has to be monotone between low and high, either way: if it is still negative at both ends it never
+    reaches zero in between.
+
+    :return: First period, None if there is none
+    """
+    if difference(low) >= 0:
+        return low
+
+    if difference(high) < 0:
+        return None
+
+    while low < high:
+        middle = (low + high) // 2
+
+        if difference(middle) >= 0:
+            high = middle
+        else:
+            low = middle + 1
+
+    return low
+
+
+def _monotone_stretches(difference: Callable[[int], float], first_end: int, last_end: int) -> List[Tuple[int, int]]:
+    """
+    Private function to split the periods up to the end of both loans into stretches where the difference is monotone.
+
+    Until the first loan ends, the difference changes by the interest on one balance less the interest on the other.
+    Both are exponentials in the period, so the change flips sign at most once, which is found by binary search.  The
+    last period before the first loan ends is its own stretch, because the final payment is clamped to the balance.
+    Between the two ends only one loan still accrues interest, so the difference only moves one way.
+
+    :param first_end: Period the first of the two loans ends
+    :param last_end: Period the last of the two loans ends
+    :return: (first, last) period of each stretch, in order
+    """
+    def rising(period: int) -> bool:
+        return difference(period + 1) >= difference(period)
+
+    stretches = []
+
+    if first_end >= 2:
+        direction = rising(0)
+        low, high = 0, first_end - 1
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if rising(middle) == direction:
+                low = middle + 1
+            else:
+                high = middle
+
+        stretches += [(0, low), (low, first_end - 1), (first_end - 1, first_end)]
+    elif first_end == 1:
+        stretches.append((0, 1))
+
+    stretches.append((first_end, last_end))
+
+    return stretches
+
+
+def compare(loan: Loan, offer: Offer) -> RefinanceResult:
+    """
+    Compare keeping a loan with refinancing its remaining balance.
+
+    The periods are split into stretches where the cost difference only moves one way, see _monotone_stretches(), and
+    the break-even period is found by binary search within the first stretch that reaches it, so no schedule is
+    simulated period by period.
+
+    :param loan: Current loan
+    :param offer: Refinance offer, its fees are the closing costs
+    :return: Comparison
+    """
+    if loan.convention.payments_per_year != offer.convention.payments_per_year:
+        raise ValueError("The loan and the offer must have the same payment frequency")
+
+    remaining = loan.periods - loan.elapsed
+    balance = remaining_balance(loan.principal, loan.payment, loan.convention.periodic_rate(loan.interest),
+                                loan.elapsed)
+    new_payment = ceil(balance * offer.convention.payment_factor(offer.interest, offer.periods))
+    savings = remaining * loan.payment - (offer.periods * new_payment + offer.fees)
+
+    def difference(period: int) -> float:
+        return _cost_difference(loan, balance, offer, new_payment, period)
+
+    # With no closing costs the two are even at the start, which only counts as breaking even if refinancing pulls ahead.
+    start = 1 if difference(0) == 0 and difference(1) < 0 else 0
+    break_even = None
+
+    for low, high in _monotone_stretches(difference, min(remaining, offer.periods), max(remaining, offer.periods)):
+        if high < start:
+            continue
+
+        break_even = _first_reaching(difference, max(low, start), high)
+
+        if break_even is not None:
+            break
+
+    return RefinanceResult(offer, balance, loan.payment, new_payment, break_even, savings)
+
+
+def compare_grid(loans: Iterable[Loan], offers: List[Offer]) -> List[List[RefinanceResult]]:
+    """
+    Compare every loan in a book with every candidate refinance offer.
+
+    :param loans: Current loans
+    :param offers: Candidate refinance offers
+    :return: One row per loan with one comparison per offer
+    """
+    return [[compare(loan, offer) for offer in offers] for loan in loans]
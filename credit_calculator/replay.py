@@ -0,0 +1,167 @@
+import json
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+from credit_calculator.calculator import Calculator
+
+SESSION_FIELD = 'session'
+ANSWERS_FIELD = 'answers'
+
+
+def read_sessions(path: Path) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Stream recorded interactive sessions from a file.
+
+    The file holds one JSON value per line: either the list of answers typed in one session, or an object with the
+    answers under 'answers' and an ID under 'session'.  Sessions without an ID are named after their line number.  Blank
+    lines are skipped.
+
+    :param path: Session file to read
+    :return: Session ID and answers for each session
+    """
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+
+            try:
+                session = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Line {line_number} of {path} is not valid JSON")
+
+            if isinstance(session, dict):
+                session_id = str(session.get(SESSION_FIELD, line_number))
+                answers = session.get(ANSWERS_FIELD)
+            else:
+                session_id, answers = str(line_number), session
+
+            if not isinstance(answers, list):
+                raise ValueError(f"Session '{session_id}' in {path} has no list of answers")
+
+            yield session_id, [str(answer) for answer in answers]
+
+
+class SessionResult:
+    def __init__(self, session_id: str, output: str = None, error: str = None, unused: int = 0):
+        """
+        Outcome of one replayed session.
+
+        :param session_id: Session ID
+        :param output: What interactive mode returned, None if the session failed
+        :param error: Why the session failed, e.g. it ran out of answers
+        :param unused: Answers left over once the session finished
+        """
+        self.session_id = session_id
+        self.output = output
+        self.error = error
+        self.unused = unused
+
+    def __repr__(self):
+        return f"SessionResult({self.session_id!r}, output={self.output!r}, error={self.error!r})"
+
+    def to_dict(self) -> dict:
+        result = {SESSION_FIELD: self.session_id, 'output': self.output}
+
+        if self.error is not None:
+            result['error'] = self.error
+
+        if self.unused:
+            result['unused'] = self.unused
+
+        return result
+
+
+class ReplayReport:
+    def __init__(self):
+        """
+        Outcome of a replay: one result per session and the time taken.
+        """
+        self.results: List[SessionResult] = []
+        self.seconds = 0.0
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for result in self.results if result.error is not None)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Sessions replayed per second.
+        """
+        return len(self.results) / self.seconds if self.seconds else float('inf')
+
+    def summary(self) -> str:
+        return (f"Replayed {len(self.results)} sessions in {self.seconds:.3f}s ({self.throughput:.0f} sessions/s), "
+                f"{self.errors} errors")
+
+
+class Replay:
+    def __init__(self, calculator: Calculator = None):
+        """
+        Feeds recorded answers to Calculator.interactive_mode instead of a terminal.
+
+        Every session goes through the same Calculator, so its prompts and their menu text are built once for the whole
+        replay.
+
+        :param calculator: Calculator to replay sessions on, a new one if not given
+        """
+        self.calculator = calculator or Calculator()
+        self.calculator.reader = self._answer
+        self.answers: Iterator[str] = iter(())
+
+    def _answer(self, text: str) -> str:
+        """
+        Private function to answer a prompt with the next recorded answer, the same way input() fails at end of file.
+        """
+        try:
+            return next(self.answers)
+        except StopIteration:
+            raise EOFError(f"Session ran out of answers at prompt {text.strip()!r}")
+
+    def run_session(self, session_id: str, answers: List[str]) -> SessionResult:
+        """
+        Replay one session.
+
+        :param session_id: Session ID
+        :param answers: Answers in the order they were typed
+        :return: Result
+        """
+        self.answers = iter(answers)
+
+        try:
+            output = self.calculator.calculate([])
+        except Exception as error:
+            return SessionResult(session_id, error=f"{type(error).__name__}: {error}")
+
+        return SessionResult(session_id, output, unused=sum(1 for _ in self.answers))
+
+    def run(self, sessions: Iterable[Tuple[str, List[str]]]) -> ReplayReport:
+        """
+        Replay sessions one after another.
+
+        :param sessions: Session ID and answers for each session, e.g. from read_sessions()
+        :return: Report
+        """
+        report = ReplayReport()
+        start = perf_counter()
+
+        for session_id, answers in sessions:
+            report.results.append(self.run_session(session_id, answers))
+
+        report.seconds = perf_counter() - start
+
+        return report
+
+
+def replay(path: Path) -> ReplayReport:
+    """
+    Replay every session in a session file.
+
+    :param path: Session file, see read_sessions()
+    :return: Report
+    """
+    return Replay().run(read_sessions(path))
@@ -0,0 +1,330 @@
+import struct
+from pathlib import Path
+from typing import BinaryIO
+from typing import Iterator
+from typing import List
+
+from credit_calculator.conventions import Convention
+from credit_calculator.conventions import FREQUENCIES
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.conventions import get_convention
+from credit_calculator.helpers.schedule_helper import differentiated_payments
+
+# File layout:
+#
+#   MAGIC, VERSION
+#   record*                   each one is a varint length followed by the record body
+#   index                     one little-endian uint64 offset per record, so any record can be found with one seek
+#   footer                    index offset and record count as little-endian uint64s, then MAGIC
+#
+# Record body:
+#
+#   loan ID                   varint length and UTF-8 bytes
+#   principal, periods        varints
+#   interest rate             little-endian float64 percentage
+#   frequencies               one byte each for the payment and compounding frequency
+#   payment count             varint
+#   residues                  varint count, then (varint index gap, zigzag varint residue) pairs
+#
+# Payments are predicted from the header with the differentiated payment formula.  Only payments that differ from the
+# prediction are stored, as a residue.  Past the end of the prediction, the previous payment is the prediction, so any
+# extra payments are delta-encoded.
+MAGIC = b'CCSA'
+VERSION = 1
+FOOTER = struct.Struct('<QQ4s')
+OFFSET = struct.Struct('<Q')
+RATE = struct.Struct('<d')
+FREQUENCY_CODES = list(FREQUENCIES)
+
+
+def _encode_varint(value: int, output: bytearray) -> None:
+    """
+    Private function to append an unsigned integer as a LEB128 varint.
+    """
+    if value < 0:
+        raise ValueError(f"Cannot store negative value {value} as a varint")
+
+    while value > 0x7f:
+        output.append((value & 0x7f) | 0x80)
+        value >>= 7
+
+    output.append(value)
+
+
+def _decode_varint(data: bytes, position: int):
+    """
+    Private function to read a LEB128 varint.
+
+    :return: Value and the position after it
+    """
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+
+        if byte < 0x80:
+            return value, position
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _predicted_payments(principal: int, periods: int, interest_rate: float, convention: Convention) -> List[int]:
+    if periods == 0:
+        return []
+
+    return differentiated_payments(principal, periods, convention.periodic_rate(interest_rate))
+
+
+class ScheduleRecord:
+    def __init__(self, loan_id: str, principal: int, periods: int, interest_rate: float, payments: List[int],
+                 convention: Convention = MONTHLY):
+        """
+        An archived amortization schedule.
+
+        :param loan_id: Loan ID
+        :param principal: Loan principal
+        :param periods: Pay periods
+        :param interest_rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :param payments: Payment for each pay period
+        :param convention: Payment and compounding frequency
+        """
+        self.loan_id = loan_id
+        self.principal = principal
+        self.periods = periods
+        self.interest_rate = interest_rate
+        self.payments = payments
+        self.convention = convention
+
+    def __eq__(self, other):
+        return isinstance(other, ScheduleRecord) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return (f"ScheduleRecord({self.loan_id!r}, {self.principal}, {self.periods}, {self.interest_rate}, "
+                f"{len(self.payments)} payments)")
+
+    def encode(self) -> bytes:
+        """
+        Encode the record body.
+
+        :return: Encoded record
+        """
+        output = bytearray()
+        loan_id = self.loan_id.encode('utf-8')
+        _encode_varint(len(loan_id), output)
+        output += loan_id
+        _encode_varint(self.principal, output)
+        _encode_varint(self.periods, output)
+        output += RATE.pack(self.interest_rate)
+        output.append(FREQUENCY_CODES.index(self.convention.payment_frequency))
+        output.append(FREQUENCY_CODES.index(self.convention.compounding_frequency))
+        _encode_varint(len(self.payments), output)
+
+        predicted = _predicted_payments(self.principal, self.periods, self.interest_rate, self.convention)
+        residues = []
+        previous = 0
+
+        for index, payment in enumerate(self.payments):
+            base = predicted[index] if index < len(predicted) else previous
+
+            if payment != base:
+                residues.append((index, payment - base))
+
+            previous = payment
+
+        _encode_varint(len(residues), output)
+        last_index = 0
+
+        for index, residue in residues:
+            _encode_varint(index - last_index, output)
+            _encode_varint(_zigzag(residue), output)
+            last_index = index
+
+        return bytes(output)
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'ScheduleRecord':
+        """
+        Decode a record body.
+
+        :param data: Encoded record
+        :return: Decoded record
+        """
+        length, position = _decode_varint(data, 0)
+        loan_id = data[position:position + length].decode('utf-8')
+        position += length
+        principal, position = _decode_varint(data, position)
+        periods, position = _decode_varint(data, position)
+        interest_rate = RATE.unpack_from(data, position)[0]
+        position += RATE.size
+        convention = get_convention(FREQUENCY_CODES[data[position]], FREQUENCY_CODES[data[position + 1]])
+        position += 2
+        count, position = _decode_varint(data, position)
+        residue_count, position = _decode_varint(data, position)
+        residues = {}
+        index = 0
+
+        for _ in range(residue_count):
+            gap, position = _decode_varint(data, position)
+            residue, position = _decode_varint(data, position)
+            index += gap
+            residues[index] = _unzigzag(residue)
+
+        predicted = _predicted_payments(principal, periods, interest_rate, convention)
+        payments = []
+        previous = 0
+
+        for index in range(count):
+            base = predicted[index] if index < len(predicted) else previous
+            previous = base + residues.get(index, 0)
+            payments.append(previous)
+
+        return cls(loan_id, principal, periods, interest_rate, payments, convention)
+
+
+class ScheduleWriter:
+    def __init__(self, path: Path):
+        """
+        Streaming writer for a schedule archive.  Records are written as they come, the index is written on close.
+
+        :param path: Archive file to create
+        """
+        self.file: BinaryIO = open(path, 'wb')
+        self.file.write(MAGIC + bytes([VERSION]))
+        self.offsets: List[int] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, loan_id: str, principal: int, periods: int, interest_rate: float, payments: List[int] = None,
+              convention: Convention = MONTHLY) -> int:
+        """
+        Append a schedule to the archive.
+
+        :param loan_id: Loan ID
+        :param principal: Loan principal
+        :param periods: Pay periods
+        :param interest_rate: Interest rate specified as a percentage, e.g. 12% is 12, 0.9% is 0.9
+        :param payments: Payment for each pay period, the differentiated payment schedule if not given
+        :param convention: Payment and compounding frequency
+        :return: Index of the record in the archive
+        """
+        if payments is None:
+            payments = _predicted_payments(principal, periods, interest_rate, convention)
+
+        body = ScheduleRecord(loan_id, principal, periods, interest_rate, payments, convention).encode()
+        header = bytearray()
+        _encode_varint(len(body), header)
+
+        self.offsets.append(self.file.tell())
+        self.file.write(header)
+        self.file.write(body)
+
+        return len(self.offsets) - 1
+
+    def close(self) -> None:
+        """
+        Write the index and footer, then close the file.
+        """
+        if self.file.closed:
+            return
+
+        index_offset = self.file.tell()
+
+        for offset in self.offsets:
+            self.file.write(OFFSET.pack(offset))
+
+        self.file.write(FOOTER.pack(index_offset, len(self.offsets), MAGIC))
+        self.file.close()
+
+
+class ScheduleReader:
+    def __init__(self, path: Path):
+        """
+        Reader for a schedule archive, with random access by record index and streaming iteration.
+
+        :param path: Archive file to read
+        """
+        self.file: BinaryIO = open(path, 'rb')
+
+        if self.file.read(len(MAGIC) + 1) != MAGIC + bytes([VERSION]):
+            self.file.close()
+            raise ValueError(f"{path} is not a version {VERSION} schedule archive")
+
+        self.file.seek(-FOOTER.size, 2)
+        self.index_offset, self.count, magic = FOOTER.unpack(self.file.read(FOOTER.size))
+
+        if magic != MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is truncated, its index is missing")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _read_record(self) -> ScheduleRecord:
+        """
+        Private function to read the record at the current file position.
+        """
+        length = 0
+        shift = 0
+
+        while True:
+            byte = self.file.read(1)[0]
+            length |= (byte & 0x7f) << shift
+            shift += 7
+
+            if byte < 0x80:
+                break
+
+        return ScheduleRecord.decode(self.file.read(length))
+
+    def __getitem__(self, index: int) -> ScheduleRecord:
+        """
+        Read one record without touching the others.
+
+        :param index: Record index, negative indexes count from the end
+        :return: Record
+        """
+        if index < 0:
+            index += self.count
+
+        if not 0 <= index < self.count:
+            raise IndexError(f"Schedule {index} is out of range, the archive holds {self.count}")
+
+        self.file.seek(self.index_offset + index * OFFSET.size)
+        self.file.seek(OFFSET.unpack(self.file.read(OFFSET.size))[0])
+
+        return self._read_record()
+
+    def __iter__(self) -> Iterator[ScheduleRecord]:
+        """
+        Stream every record in order.  Random access in between is fine, iteration picks up where it left off.
+        """
+        position = len(MAGIC) + 1
+
+        for _ in range(self.count):
+            self.file.seek(position)
+            record = self._read_record()
+            position = self.file.tell()
+            yield record
+
+    def close(self) -> None:
+        self.file.close()
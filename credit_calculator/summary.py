@@ -0,0 +1,237 @@
+from math import ceil
+from math import log
+from typing import Dict
+
+METRICS = ('payment', 'overpayment', 'term')
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Welford:
+    def __init__(self):
+        """
+        Running count, mean, variance, minimum and maximum in constant memory.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: float = None
+        self.max: float = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'Welford') -> None:
+        """
+        Fold another accumulator into this one, as if every value had been added here.
+
+        :param other: Accumulator to merge
+        """
+        if other.count == 0:
+            return
+
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """
+        Sample variance, zero for fewer than two values.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Mergeable quantile sketch with logarithmic buckets.
+
+        Every quantile is within the relative accuracy of a true value.  Memory is bounded by the number of buckets, not
+        the number of values: once there are more than max_buckets buckets on one side of zero, the buckets closest to
+        zero are collapsed, which only costs accuracy on the smallest values.
+
+        :param relative_accuracy: Relative error allowed on each quantile
+        :param max_buckets: Bucket limit on each side of zero
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = log(self.gamma)
+        self.max_buckets = max_buckets
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+
+    def _collapse(self, buckets: Dict[int, int]) -> None:
+        while len(buckets) > self.max_buckets:
+            lowest, second = sorted(buckets)[:2]
+            buckets[second] += buckets.pop(lowest)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+
+        if value == 0:
+            self.zero += 1
+            return
+
+        buckets = self.positive if value > 0 else self.negative
+        index = ceil(log(abs(value)) / self.log_gamma)
+        buckets[index] = buckets.get(index, 0) + 1
+
+        if len(buckets) > self.max_buckets:
+            self._collapse(buckets)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        Fold another sketch into this one.  Both sketches must use the same relative accuracy.
+
+        :param other: Sketch to merge
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+
+            self._collapse(buckets)
+
+        self.zero += other.zero
+        self.count += other.count
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile, using the nearest-rank definition.
+
+        :param q: Quantile between 0 and 1, e.g. 0.99 for p99
+        :return: Estimated value, None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+
+        rank = max(ceil(q * self.count) - 1, 0)
+        seen = 0
+
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+
+            if seen > rank:
+                return -self._value(index)
+
+        seen += self.zero
+
+        if seen > rank:
+            return 0.0
+
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+
+            if seen > rank:
+                return self._value(index)
+
+        return self._value(max(self.positive))
+
+
+class Summary:
+    def __init__(self):
+        """
+        Distribution of one metric: moments, extremes and quantiles.
+        """
+        self.moments = Welford()
+        self.sketch = QuantileSketch()
+
+    def add(self, value: float) -> None:
+        self.moments.add(value)
+        self.sketch.add(value)
+
+    def merge(self, other: 'Summary') -> None:
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+
+    def report(self) -> dict:
+        """
+        Summary statistics as a dictionary.
+
+        :return: count, mean, variance, min, max and p50/p90/p99
+        """
+        report = {
+            'count': self.moments.count,
+            'mean': self.moments.mean,
+            'variance': self.moments.variance,
+            'min': self.moments.min,
+            'max': self.moments.max
+        }
+
+        for q in QUANTILES:
+            value = self.sketch.quantile(q)
+
+            # Estimates are bucket midpoints, keep them inside the observed range.
+            if value is not None:
+                value = min(max(value, self.moments.min), self.moments.max)
+
+            report[f"p{round(q * 100)}"] = value
+
+        return report
+
+
+class BatchSummary:
+    def __init__(self):
+        """
+        Payment, overpayment and term distributions for a batch or portfolio run, by calculation type.
+
+        Summaries from parallel workers can be combined with merge().
+        """
+        self.summaries: Dict[str, Dict[str, Summary]] = {}
+
+    def add(self, calculation_type: str, values: dict) -> None:
+        """
+        Add one calculation result.
+
+        :param calculation_type: 'annuity' or 'diff'
+        :param values: Calculator values with the payment, overpayment and term
+        """
+        if calculation_type not in self.summaries:
+            self.summaries[calculation_type] = {metric: Summary() for metric in METRICS}
+
+        for metric in METRICS:
+            self.summaries[calculation_type][metric].add(values[metric])
+
+    def merge(self, other: 'BatchSummary') -> None:
+        """
+        Fold another batch summary into this one.
+
+        :param other: Summary to merge, e.g. from another worker
+        """
+        for calculation_type, summaries in other.summaries.items():
+            if calculation_type not in self.summaries:
+                self.summaries[calculation_type] = {metric: Summary() for metric in METRICS}
+
+            for metric, summary in summaries.items():
+                self.summaries[calculation_type][metric].merge(summary)
+
+    def report(self) -> dict:
+        """
+        Summary statistics for every calculation type and metric.
+
+        :return: {calculation type: {metric: statistics}}
+        """
+        return {
+            calculation_type: {metric: summary.report() for metric, summary in summaries.items()}
+            for calculation_type, summaries in sorted(self.summaries.items())
+        }
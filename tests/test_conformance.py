@@ -0,0 +1,90 @@
+from itertools import islice
+
+import pytest
+
+from credit_calculator.conformance import CHECKS
+from credit_calculator.conformance import Check
+from credit_calculator.conformance import main
+from credit_calculator.conformance import random_loans
+from credit_calculator.conformance import run
+from credit_calculator.conformance import run_check
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.conventions import annuity_payments
+
+
+def test_random_loans_are_reproducible():
+    assert list(islice(random_loans(3), 400)) == list(islice(random_loans(3), 400))
+
+
+@pytest.mark.parametrize('name', list(CHECKS))
+def test_fast_paths_match_the_calculator(name):
+    report = run(600, checks=[name], chunk_size=128)[0]
+
+    assert report.checked == 600
+    assert report.mismatch_count == 0, str(report)
+
+
+def test_zero_interest_loans_are_reported():
+    payment, schedule = run(1000, checks=['annuity_payment', 'differentiate_payment'])
+
+    assert payment.zero_interest > 0
+    assert "at 0% interest are paid in straight installments" in str(payment)
+    assert schedule.zero_interest == 0
+    assert "archive round-trip" in str(schedule)
+    assert not str(schedule).endswith("x")
+
+
+def test_mismatches_are_reported():
+    reference = CHECKS['annuity_payment'].reference
+    check = Check('off_by_one', lambda loan: loan, reference,
+                  lambda loans: [payment + 1 for payment in annuity_payments(loans)])
+
+    report = run_check(check, 300, max_mismatches=3)
+
+    assert report.mismatch_count == 300
+    assert len(report.mismatches) == 3
+    assert report.mismatches[0].actual == report.mismatches[0].expected + 1
+    assert "300 MISMATCHES" in str(report)
+
+
+def test_a_bad_cached_factor_is_caught_on_both_paths(monkeypatch):
+    factor = MONTHLY.payment_factor
+    monkeypatch.setattr(MONTHLY, 'payment_factor', lambda rate, periods: factor(rate, periods) * 1.01)
+
+    report = run(200, checks=['annuity_payment'])[0]
+
+    assert {mismatch.path for mismatch in report.mismatches} == {'fast', 'calculator'}
+
+
+def test_calculator_output_is_compared():
+    reference = CHECKS['annuity_payment'].reference
+
+    def calculator(arguments):
+        value, output = reference(arguments)
+
+        return value, output.replace("Overpayment", "Overpaid")
+
+    check = Check('wording', lambda loan: loan, reference, annuity_payments, calculator)
+    report = run_check(check, 100)
+
+    assert report.mismatch_count > 0
+    assert all(mismatch.path == 'calculator' for mismatch in report.mismatches)
+
+
+def test_failing_batches_are_checked_loan_by_loan():
+    def fragile(loans):
+        if any(loan[0] == 1 for loan in loans):
+            raise ZeroDivisionError
+
+        return annuity_payments(loans)
+
+    check = Check('fragile', lambda loan: loan, CHECKS['annuity_payment'].reference, fragile)
+    report = run_check(check, 300)
+
+    assert 0 < report.mismatch_count < 300
+    assert all(mismatch.actual == "raised ZeroDivisionError" for mismatch in report.mismatches)
+
+
+def test_main(capsys):
+    assert main(['--count', '100', '--check', 'annuity_payment']) == 0
+    assert capsys.readouterr().out.startswith("annuity_payment: 100 loans, OK")
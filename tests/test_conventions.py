@@ -0,0 +1,99 @@
+import pytest
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.conventions import MONTHLY
+from credit_calculator.conventions import annuity_payments
+from credit_calculator.conventions import annuity_timeframes
+from credit_calculator.conventions import get_convention
+
+
+@pytest.fixture()
+def calculator():
+    calculator = Calculator()
+
+    yield calculator
+
+
+def test_monthly_is_the_default(calculator):
+    assert calculator.convention is MONTHLY
+    assert MONTHLY.periodic_rate(10) == (10 / 12) / 100
+
+
+def test_conventions_are_shared():
+    assert get_convention('weekly') is get_convention('weekly', 'weekly')
+    assert get_convention('weekly', 'monthly') is not get_convention('weekly')
+
+
+def test_compounding_conversion():
+    biweekly = get_convention('biweekly', 'monthly')
+
+    assert (1 + biweekly.periodic_rate(12)) ** 26 == pytest.approx(1.01 ** 12)
+
+
+def test_unknown_frequency():
+    with pytest.raises(ValueError):
+        get_convention('hourly')
+
+
+def test_quarterly_differentiate_payments(calculator):
+    args = [
+        '--type', 'diff',
+        '--principal', '10000',
+        '--periods', '4',
+        '--interest', '8',
+        '--frequency', 'quarterly'
+    ]
+
+    assert calculator.calculate(args) == ("Quarter 1: paid out 2700\nQuarter 2: paid out 2650\nQuarter 3: paid out 2600\n"
+                                          "Quarter 4: paid out 2550\n\nOverpayment = 500")
+
+
+def test_biweekly_timeframe(calculator):
+    args = [
+        '--type', 'annuity',
+        '--principal', '100000',
+        '--payment', '1000',
+        '--interest', '6',
+        '--frequency', 'biweekly'
+    ]
+
+    assert calculator.calculate(args) == "You need 4 years and 10 fortnights to repay this credit!\nOverpayment = 14000"
+
+
+def test_mixed_book_in_one_pass():
+    weekly = get_convention('weekly', 'monthly')
+    quarterly = get_convention('quarterly')
+    loans = [
+        (1000000, 60, 10, MONTHLY),
+        (1000000, 260, 10, weekly),
+        (1000000, 20, 10, quarterly)
+    ]
+    expected = [Calculator(convention).annuity_payment(principal, timeframe, interest)
+                for principal, timeframe, interest, convention in loans]
+
+    payments = annuity_payments(loans)
+
+    assert payments[0] == 21248
+    assert [f"Your annuity payment = {payment}!" for payment in payments] == [text.split("\n")[0] for text in expected]
+
+
+def test_interactive_mode_goes_back_to_the_default_convention(monkeypatch, calculator):
+    calculator.calculate(['--type', 'annuity', '--principal', '1000000', '--periods', '60', '--interest', '10',
+                          '--frequency', 'weekly'])
+    answers = iter(['a', 'a', '1000000', '60', '10'])
+    monkeypatch.setattr('builtins.input', lambda text='': next(answers))
+
+    assert calculator.calculate([]) == "Your annuity payment = 21248!\nOverpayment = 274880"
+
+
+@pytest.mark.parametrize('args, expected', [
+    (['--principal', '1000', '--periods', '12'], "Your annuity payment = 84!\nOverpayment = 8"),
+    (['--payment', '84', '--periods', '12'], "Your credit principal = 1008!"),
+    (['--principal', '1000', '--payment', '84'], "You need 1 year to repay this credit!\nOverpayment = 8")
+])
+def test_zero_interest_is_paid_in_straight_installments(calculator, args, expected):
+    assert calculator.calculate(['--type', 'annuity', '--interest', '0'] + args) == expected
+
+
+def test_zero_interest_timeframes_in_one_pass():
+    assert annuity_timeframes([(1000, 84, 0, MONTHLY), (1000, 100, 0, MONTHLY)]) == [12, 10]
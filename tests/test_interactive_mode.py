@@ -64,3 +64,11 @@ def test_interactive_differentiate_payments(monkeypatch, calculator):
     actual_text = calculator.calculate([])
 
     assert actual_text == expected_text
+
+
+def test_interactive_mode_reads_patched_input(monkeypatch, calculator):
+    answers = iter(['a', 'a', '1000000', '60', '10'])
+
+    monkeypatch.setattr('builtins.input', lambda text='': next(answers))
+
+    assert calculator.calculate([]) == "Your annuity payment = 21248!\nOverpayment = 274880"
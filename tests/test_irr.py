@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+
+from credit_calculator.irr import annual_percentage_rate
+from credit_calculator.irr import irr
+from credit_calculator.irr import solve
+from credit_calculator.irr import xirr
+
+
+def test_irr_of_several_rows():
+    results = irr([[-100, 60, 60], [-100, 110], [-100, 10, 10]])
+
+    assert all(result.converged for result in results)
+    assert results[0].rate == pytest.approx(0.130662386, abs=1e-9)
+    assert results[1].rate == pytest.approx(0.1)
+    assert results[2].rate == pytest.approx(-0.629843788, abs=1e-9)
+
+
+def test_non_convergence_is_reported_per_row():
+    results = irr([[100, 10], [], [-100, 110]])
+
+    assert [result.converged for result in results] == [False, False, True]
+    assert results[0].rate is None
+    assert results[0].reason == 'cash flows do not change sign'
+
+
+def test_root_at_the_lowest_rate_converges():
+    result = irr([[-1, 0.01]])[0]
+
+    assert result.converged
+    assert result.rate == -0.99
+
+
+def test_overflow_is_reported_per_row():
+    results = annual_percentage_rate([(1000, 360, 10, 999), (1000, 360, 10, 5000), (1000000, 60, 10, 0)])
+
+    assert [result.converged for result in results] == [False, False, True]
+    assert 'overflows' in results[0].reason
+
+
+def test_overflow_while_solving_is_reported_per_row():
+    def npv(rate, slope):
+        if 0 < rate < 0.5:
+            raise OverflowError
+
+        return slope * (rate - 0.2), slope
+
+    results = solve([(1.0,), (-1.0,)], npv=npv)
+
+    assert [result.converged for result in results] == [False, False]
+    assert all(result.reason.startswith('net present value overflows') for result in results)
+
+
+def test_xirr_with_prepayment():
+    flows = [
+        (date(2020, 1, 1), -1000),
+        (date(2020, 7, 1), 500),
+        (date(2021, 1, 1), 600)
+    ]
+    result = xirr([flows])[0]
+    annual = result.rate
+    value = sum(amount * (1 + annual) ** -((when - date(2020, 1, 1)).days / 365) for when, amount in flows)
+
+    assert result.converged
+    assert value == pytest.approx(0, abs=1e-6)
+
+
+def test_apr_without_fees_matches_interest_rate():
+    result = annual_percentage_rate([(1000000, 60, 10, 0)])[0]
+
+    assert result.converged
+    assert result.rate == pytest.approx(10, abs=0.01)
+
+
+def test_fees_raise_the_apr():
+    without_fees, with_fees = annual_percentage_rate([(1000000, 60, 10, 0), (1000000, 60, 10, 20000)])
+
+    assert with_fees.rate > without_fees.rate
+    assert with_fees.rate == pytest.approx(10.878, abs=0.001)
@@ -0,0 +1,108 @@
+import json
+from urllib.request import urlopen
+
+import pytest
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.metrics import metrics
+
+
+@pytest.fixture()
+def calculator():
+    metrics.reset()
+    metrics.enable()
+    calculator = Calculator()
+
+    yield calculator
+
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_metrics_record_nothing():
+    metrics.reset()
+    Calculator().calculate(['--type', 'annuity', '--principal', '1000000', '--periods', '60', '--interest', '10'])
+
+    assert metrics.snapshot() == {'operations': {}}
+
+
+def test_calls_are_counted(calculator):
+    args = ['--type', 'annuity', '--principal', '1000000', '--periods', '60', '--interest', '10']
+
+    calculator.calculate(args)
+    operations = metrics.snapshot()['operations']
+
+    assert operations['check_arguments']['calls'] == 1
+    assert operations['annuity_payment']['calls'] == 1
+    assert operations['format_output']['calls'] == 1
+    assert operations['annuity_payment']['latency_seconds']['count'] == 1
+
+
+def test_errors_are_counted_by_type(calculator):
+    calculator.calculate(['--type', 'annuity', '--principal', '-30000', '--periods', '14', '--interest', '10.2'])
+    operations = metrics.snapshot()['operations']
+
+    assert operations['check_arguments']['errors'] == {'NegativeValueError': 1}
+    assert operations['calculate']['calls'] == 1
+    assert operations['calculate']['errors'] == {}
+
+
+def test_errors_after_the_argument_check_are_counted_under_calculate(calculator):
+    calculator.calculate(['--type', 'diff', '--principal', '500000', '--payment', '8', '--interest', '7.8'])
+    operations = metrics.snapshot()['operations']
+
+    assert operations['check_arguments']['errors'] == {}
+    assert operations['calculate']['errors'] == {'ValueMissingError': 1}
+    assert operations['calculate']['latency_seconds']['count'] == 1
+
+
+def test_errors_are_counted_once_where_they_are_raised(calculator):
+    with pytest.raises(ValueError):
+        calculator.calculate(['--type', 'annuity', '--principal', '1000', '--payment', '5', '--interest', '10'])
+
+    operations = metrics.snapshot()['operations']
+
+    assert operations['annuity_timeframe']['errors'] == {'ValueError': 1}
+    assert operations['calculate']['errors'] == {}
+    assert operations['calculate']['calls'] == 1
+
+
+def test_every_operation_has_the_same_keys(calculator):
+    metrics.count_error('load', ValueError())
+    calculator.calculate(['--type', 'diff', '--principal', '500000', '--periods', '8', '--interest', '7.8'])
+    operations = metrics.snapshot()['operations']
+
+    assert operations['load']['calls'] == 0
+    assert operations['load']['latency_seconds']['count'] == 0
+    assert all(set(operation) == {'calls', 'latency_seconds', 'errors'} for operation in operations.values())
+
+
+def test_prometheus_text(calculator):
+    calculator.calculate(['--type', 'diff', '--principal', '500000', '--periods', '8', '--interest', '7.8'])
+    text = metrics.to_prometheus()
+
+    assert 'credit_calculator_calls_total{operation="differentiate_payment"} 1' in text
+    assert 'credit_calculator_duration_seconds_count{operation="differentiate_payment"} 1' in text
+    assert 'credit_calculator_duration_seconds_bucket{operation="differentiate_payment",le="+Inf"} 1' in text
+
+
+def test_write_json_snapshot(calculator, tmp_path):
+    calculator.calculate(['--type', 'diff', '--principal', '500000', '--periods', '8', '--interest', '7.8'])
+    path = tmp_path / 'metrics.json'
+    metrics.write(path)
+
+    assert json.loads(path.read_text())['operations']['differentiate_payment']['calls'] == 1
+
+
+def test_serve_over_http(calculator):
+    calculator.calculate(['--type', 'diff', '--principal', '500000', '--periods', '8', '--interest', '7.8'])
+    server = metrics.serve(0)
+
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        text = urlopen(url).read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'operation="differentiate_payment"' in text
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.conventions import get_convention
+from credit_calculator.offers import Offer
+from credit_calculator.offers import best_offers
+from credit_calculator.offers import offer_payment
+
+
+@pytest.fixture()
+def offers():
+    generator = random.Random(4)
+
+    yield [
+        Offer(f"lender-{index}", round(generator.uniform(2, 25), 2), generator.choice([12, 36, 60, 120, 360]),
+              generator.randint(0, 5000))
+        for index in range(3000)
+    ]
+
+
+def brute_force(principal, offers, k, rank_by):
+    def value(offer):
+        payment = offer_payment(principal, offer)
+
+        if rank_by == 'payment':
+            return payment
+
+        return payment * offer.periods - principal + offer.fees
+
+    ranked = sorted((value(offer), index, offer) for index, offer in enumerate(offers))
+
+    return [(value, offer) for value, _, offer in ranked[:k]]
+
+
+def test_offer_payment_matches_calculator():
+    payment = offer_payment(1000000, Offer('lender', 10, 60))
+
+    assert Calculator().annuity_payment(1000000, 60, 10).startswith(f"Your annuity payment = {payment}!")
+
+
+@pytest.mark.parametrize('rank_by', ['payment', 'overpayment'])
+def test_top_k_matches_full_sort(offers, rank_by):
+    assert best_offers(250000, offers, 15, rank_by, chunk_size=256) == brute_force(250000, offers, 15, rank_by)
+
+
+@pytest.mark.parametrize('rank_by', ['payment', 'overpayment'])
+def test_top_k_with_mixed_conventions_matches_full_sort(rank_by):
+    generator = random.Random(7)
+    conventions = [get_convention(payment, compounding)
+                   for payment in ('monthly', 'biweekly', 'quarterly') for compounding in ('annual', 'monthly', 'daily')]
+    offers = [
+        Offer(f"lender-{index}", round(generator.uniform(0, 25), 2), generator.randint(1, 400), generator.randint(0, 5000),
+              generator.choice(conventions))
+        for index in range(3000)
+    ]
+
+    assert best_offers(250000, offers, 7, rank_by, chunk_size=100) == brute_force(250000, offers, 7, rank_by)
+
+
+def test_ties_go_to_the_first_offer():
+    offers = [Offer('first', 10, 60), Offer('second', 10, 60), Offer('third', 12, 60)]
+
+    assert [offer.lender for _, offer in best_offers(1000000, offers, 2)] == ['first', 'second']
+
+
+def test_fewer_offers_than_k():
+    offers = [Offer('dear', 12, 60), Offer('cheap', 0, 60)]
+
+    assert best_offers(60000, offers, 5) == [(1000, offers[1]), (offer_payment(60000, offers[0]), offers[0])]
+
+
+def test_unknown_ranking():
+    with pytest.raises(ValueError):
+        best_offers(1000, [], rank_by='apr')
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from credit_calculator.portfolio import read_loans
+from credit_calculator.portfolio import revalue
+
+HEADER = "loan_id,type,principal,periods,interest,payment\n"
+
+
+@pytest.fixture()
+def files(tmp_path):
+    yield tmp_path / 'loans.csv', tmp_path / 'snapshot.json', tmp_path / 'delta.jsonl'
+
+
+def read_delta(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_first_run_values_every_loan(files):
+    loans, snapshot, delta = files
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\nb,annuity,,120,5.6,8722\n")
+
+    revaluation = revalue(loans, snapshot, delta)
+
+    assert revaluation.new == ['a', 'b']
+    assert read_delta(delta) == [
+        {'loan_id': 'a', 'status': 'new', 'result': "Your annuity payment = 21248!\nOverpayment = 274880"},
+        {'loan_id': 'b', 'status': 'new', 'result': "Your credit principal = 800019!\nOverpayment = 246621"}
+    ]
+
+
+def test_only_changed_new_and_deleted_loans_are_in_the_delta(files):
+    loans, snapshot, delta = files
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\nb,annuity,,120,5.6,8722\nc,diff,500000,8,7.8,\n")
+    revalue(loans, snapshot, delta)
+
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\nc,diff,500000,8,7.9,\nd,annuity,500000,,7.8,23000\n")
+    revaluation = revalue(loans, snapshot, delta)
+
+    assert revaluation.changed == ['c']
+    assert revaluation.new == ['d']
+    assert revaluation.deleted == ['b']
+    assert revaluation.unchanged == 1
+    assert [(entry['loan_id'], entry['status']) for entry in read_delta(delta)] == [
+        ('c', 'changed'), ('d', 'new'), ('b', 'deleted')
+    ]
+    assert sorted(json.loads(snapshot.read_text())['loans']) == ['a', 'c', 'd']
+
+
+def test_unchanged_portfolio_has_an_empty_delta(files):
+    loans, snapshot, delta = files
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\n")
+    revalue(loans, snapshot, delta)
+
+    assert revalue(loans, snapshot, delta).unchanged == 1
+    assert delta.read_text() == ""
+
+
+def test_incorrect_loans_are_reported_not_prompted(files):
+    loans, snapshot, delta = files
+    loans.write_text(HEADER + "a,,,,,\nb,annuity,-5,60,10,\n")
+    revalue(loans, snapshot, delta)
+
+    assert [entry['result'] for entry in read_delta(delta)] == ["Incorrect parameters", "Incorrect parameters"]
+
+
+def test_failing_loans_are_reported_and_the_run_carries_on(files):
+    loans, snapshot, delta = files
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\nb,annuity,1000,,10,5\nc,diff,500000,0,7.8,\n")
+
+    revaluation = revalue(loans, snapshot, delta)
+    entries = read_delta(delta)
+
+    assert revaluation.new == ['a', 'b', 'c']
+    assert entries[0]['result'] == "Your annuity payment = 21248!\nOverpayment = 274880"
+    assert entries[1]['result'] is None and entries[1]['error'].startswith("ValueError")
+    assert entries[2]['result'] is None and entries[2]['error'].startswith("ZeroDivisionError")
+    assert json.loads(snapshot.read_text())['loans']['b']['error'] == entries[1]['error']
+
+
+def test_type_and_frequencies_are_case_insensitive(files):
+    loans, snapshot, delta = files
+    loans.write_text("loan_id,type,principal,periods,interest,frequency\na,Annuity,1000000,60,10,MONTHLY\n")
+
+    revalue(loans, snapshot, delta)
+
+    assert read_delta(delta)[0]['result'] == "Your annuity payment = 21248!\nOverpayment = 274880"
+
+
+def test_invalid_cells_are_reported_per_loan(files):
+    loans, snapshot, delta = files
+    loans.write_text("loan_id,type,principal,periods,interest,frequency\n"
+                     "a,annuity,lots,60,10,\nb,annuity,1000000,60,10,hourly\nc,annuity,1000000,60,10,monthly\n")
+
+    revaluation = revalue(loans, snapshot, delta)
+    entries = read_delta(delta)
+
+    assert revaluation.new == ['a', 'b', 'c']
+    assert entries[0]['error'] == "ValueError: non-numeric principal: 'lots'"
+    assert entries[1]['error'].startswith("ValueError: unknown frequency: 'hourly'")
+    assert entries[2]['result'] == "Your annuity payment = 21248!\nOverpayment = 274880"
+
+
+def test_overflowing_loans_are_reported(files):
+    loans, snapshot, delta = files
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\nb,annuity,1000000,200000,10,\n")
+
+    revalue(loans, snapshot, delta)
+    entries = read_delta(delta)
+
+    assert entries[0]['result'] == "Your annuity payment = 21248!\nOverpayment = 274880"
+    assert entries[1]['error'].startswith("OverflowError")
+
+
+def test_duplicate_loans_are_rejected(tmp_path):
+    loans = tmp_path / 'loans.csv'
+    loans.write_text(HEADER + "a,annuity,1000000,60,10,\na,annuity,1000000,60,10,\n")
+
+    with pytest.raises(ValueError):
+        read_loans(loans)
@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.profiling import Profile
+
+ARGS = ['--type', 'diff', '--principal', '1000000', '--periods', '10', '--interest', '10']
+
+
+@pytest.fixture()
+def calculator():
+    calculator = Calculator()
+
+    yield calculator
+
+
+def test_profile_does_not_change_output(calculator):
+    expected = Calculator().calculate(ARGS)
+
+    assert Profile('cprofile').run(calculator.calculate, ARGS) == expected
+
+
+def test_cprofile_writes_pstats_and_collapsed_stacks(calculator, tmp_path):
+    profile = Profile('cprofile')
+    profile.run(calculator.calculate, ARGS)
+    written = profile.write(str(tmp_path / 'run'))
+
+    assert [path.name for path in written] == ['run.pstats', 'run.collapsed']
+
+    for line in (tmp_path / 'run.collapsed').read_text().splitlines():
+        stack, weight = line.rsplit(' ', 1)
+        assert int(weight) > 0
+
+
+def test_summary_lists_calculator_functions(calculator):
+    profile = Profile('cprofile')
+    profile.run(calculator.calculate, ARGS)
+    stream = StringIO()
+    profile.print_summary(5, stream)
+
+    assert 'differentiate_payment' in stream.getvalue()
+
+
+def test_sampling_profile(tmp_path):
+    def many_calculations():
+        for _ in range(2000):
+            Calculator().calculate(ARGS)
+
+        return 'done'
+
+    profile = Profile('sampling', interval=0.0005)
+
+    assert profile.run(many_calculations) == 'done'
+    assert sum(profile.collapsed_stacks().values()) > 0
+    assert [path.name for path in profile.write(str(tmp_path / 'run'))] == ['run.collapsed']
+
+
+def test_unknown_profiler():
+    with pytest.raises(ValueError):
+        Profile('perf')
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from credit_calculator.offers import Offer
+from credit_calculator.refinance import Loan
+from credit_calculator.refinance import _cost_difference
+from credit_calculator.refinance import compare
+from credit_calculator.refinance import compare_grid
+from credit_calculator.refinance import remaining_balance
+
+
+def simulated_break_even(loan, result):
+    for period in range(max(loan.periods - loan.elapsed, result.offer.periods) + 1):
+        if _cost_difference(loan, result.balance, result.offer, result.new_payment, period) >= 0:
+            return period
+
+    return None
+
+
+def test_loan_payment_matches_calculator():
+    assert Loan(1000000, 60, 10).payment == 21248
+
+
+def test_balance_is_paid_off_at_the_end_of_the_term():
+    loan = Loan(1000000, 60, 10)
+
+    assert remaining_balance(1000000, loan.payment, 10 / 12 / 100, 0) == 1000000
+    assert remaining_balance(1000000, loan.payment, 10 / 12 / 100, 60) == 0
+
+
+def test_lower_rate_breaks_even():
+    result = compare(Loan(300000, 360, 7, 36), Offer('bank', 5, 360, 4000))
+
+    assert result.break_even == 9
+    assert result.new_payment < result.payment
+    assert result.savings == 81824
+
+
+def test_higher_rate_never_breaks_even():
+    result = compare(Loan(300000, 360, 5, 36), Offer('bank', 7, 360, 4000))
+
+    assert result.break_even is None
+    assert result.savings < 0
+
+
+@pytest.mark.parametrize('rate, periods, fees', [(4, 360, 0), (4.5, 120, 2500), (6.5, 60, 9000), (2, 360, 20000)])
+def test_binary_search_matches_simulation(rate, periods, fees):
+    loan = Loan(450000, 180, 6.75, 24)
+    result = compare(loan, Offer('bank', rate, periods, fees))
+
+    assert result.break_even == simulated_break_even(loan, result)
+
+
+@pytest.mark.parametrize('loan, offer, break_even', [
+    (Loan(854506, 360, 7.03, 337), Offer('x', 3.78, 360, 1000), 4),
+    (Loan(165034, 360, 9.06, 354), Offer('x', 5.7, 60, 1000), 6)
+])
+def test_loans_near_the_end_of_their_term(loan, offer, break_even):
+    result = compare(loan, offer)
+
+    assert result.break_even == break_even == simulated_break_even(loan, result)
+
+
+def test_random_loans_match_simulation():
+    generator = random.Random(2)
+
+    for _ in range(3000):
+        periods = generator.choice([60, 120, 180, 360])
+        # Half of the loans are within 30 periods of their end, where the old loan's payoff is a kink in the curve.
+        elapsed = generator.choice([generator.randint(0, periods), periods - generator.randint(0, 30)])
+        loan = Loan(generator.randint(1000, 1000000), periods, round(generator.uniform(1, 12), 2), elapsed)
+        offer = Offer('bank', round(generator.uniform(0.5, 12), 2), generator.choice([12, 60, 120, 360]),
+                      generator.randint(1, 20000))
+        result = compare(loan, offer)
+
+        assert result.break_even == simulated_break_even(loan, result), (loan, offer)
+
+
+def test_grid():
+    loans = [Loan(300000, 360, 7, 36), Loan(150000, 180, 6, 12)]
+    offers = [Offer('a', 5, 360, 4000), Offer('b', 4.5, 180, 2500), Offer('c', 8, 360, 0)]
+
+    grid = compare_grid(loans, offers)
+
+    assert [len(row) for row in grid] == [3, 3]
+    assert grid[0][0].break_even == 9
+    assert grid[1][2].break_even is None
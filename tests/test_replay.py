@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.prompt import Prompt
+from credit_calculator.replay import Replay
+from credit_calculator.replay import read_sessions
+from credit_calculator.replay import replay
+
+
+@pytest.fixture()
+def sessions(tmp_path):
+    path = tmp_path / 'sessions.jsonl'
+    lines = [
+        ["a", "n", "500000", "23000", "7.8"],
+        {"session": "kiosk-2", "answers": ["a", "p", "8722", "120", "5.6"]},
+        {"session": "short", "answers": ["a", "n"]},
+        ["d", "500000", "8", "7.8", "extra"]
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n\n")
+
+    yield path
+
+
+def test_sessions_are_read_with_ids(sessions):
+    assert [session_id for session_id, _ in read_sessions(sessions)] == ['1', 'kiosk-2', 'short', '4']
+
+
+def test_sessions_without_answers_are_rejected(tmp_path):
+    path = tmp_path / 'sessions.jsonl'
+    path.write_text('{"session": "x"}\n')
+
+    with pytest.raises(ValueError):
+        list(read_sessions(path))
+
+
+def test_replay_matches_interactive_mode(sessions):
+    report = replay(sessions)
+    results = {result.session_id: result for result in report.results}
+
+    assert results['1'].output == "You need 2 years to repay this credit!\nOverpayment = 52000"
+    assert results['kiosk-2'].output == "Your credit principal = 800019!\nOverpayment = 246621"
+    assert results['4'].output.startswith("Month 1: paid out 65750\n")
+    assert results['4'].unused == 1
+
+
+def test_sessions_that_run_out_of_answers_fail_alone(sessions):
+    report = replay(sessions)
+    short = report.results[2]
+
+    assert short.output is None
+    assert short.error.startswith("EOFError")
+    assert report.errors == 1
+    assert len(report.results) == 4
+
+
+def test_prompts_are_built_once_for_all_sessions():
+    calculator = Calculator()
+    session = Replay(calculator)
+    session.run_session('1', ["a", "a", "1000000", "60", "10"])
+    type_prompt = calculator.type_prompt
+
+    result = session.run_session('2', ["a", "a", "1000000", "60", "10"])
+
+    assert calculator.type_prompt is type_prompt
+    assert result.output == "Your annuity payment = 21248!\nOverpayment = 274880"
+
+
+def test_prompt_text_is_cached():
+    answers = iter(['x', 'y'])
+    seen = []
+
+    def reader(text):
+        seen.append(text)
+        return next(answers)
+
+    prompt = Prompt("Please enter the credit principal", reader=reader)
+
+    assert prompt.prompt() == 'x'
+    assert prompt.prompt() == 'y'
+    assert seen[0] is seen[1]
@@ -0,0 +1,73 @@
+import pytest
+
+from credit_calculator.conventions import get_convention
+from credit_calculator.helpers.schedule_helper import differentiated_payments
+from credit_calculator.schedule_archive import ScheduleReader
+from credit_calculator.schedule_archive import ScheduleRecord
+from credit_calculator.schedule_archive import ScheduleWriter
+from tests.helpers.file_helper import text_from_file
+
+
+@pytest.fixture()
+def archive(tmp_path):
+    path = tmp_path / 'schedules.ccsa'
+
+    with ScheduleWriter(path) as writer:
+        writer.write('diff-1', 1000000, 10, 10)
+        writer.write('diff-2', 500000, 8, 7.8)
+        writer.write('prepaid', 1000, 3, 5.0, [1, -5, 400, 400, 401])
+        writer.write('weekly', 10000, 52, 5.0, convention=get_convention('weekly', 'monthly'))
+
+    yield path
+
+
+def schedule_from_text(file_name):
+    lines = text_from_file(file_name, True).splitlines()
+
+    return [int(line.rsplit(' ', 1)[1]) for line in lines if line.startswith('Month')]
+
+
+def test_schedules_reconstruct_from_header(archive):
+    with ScheduleReader(archive) as reader:
+        assert reader[0].payments == schedule_from_text('diff_example_1.txt')
+        assert reader[1].payments == schedule_from_text('diff_example_2.txt')
+
+
+def test_payments_off_the_formula_round_trip(archive):
+    with ScheduleReader(archive) as reader:
+        assert reader[2].payments == [1, -5, 400, 400, 401]
+        assert reader[-1].convention is get_convention('weekly', 'monthly')
+
+
+def test_streaming_read(archive):
+    with ScheduleReader(archive) as reader:
+        records = iter(reader)
+        first = next(records)
+        reader[3]
+
+        assert len(reader) == 4
+        assert first.loan_id == 'diff-1'
+        assert [record.loan_id for record in records] == ['diff-2', 'prepaid', 'weekly']
+
+
+def test_formula_schedules_store_no_payments():
+    payments = differentiated_payments(1000000, 360, 4.5 / 12 / 100)
+    record = ScheduleRecord('loan', 1000000, 360, 4.5, payments)
+    encoded = record.encode()
+
+    assert len(encoded) < 32
+    assert ScheduleRecord.decode(encoded) == record
+
+
+def test_out_of_range(archive):
+    with ScheduleReader(archive) as reader:
+        with pytest.raises(IndexError):
+            reader[4]
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / 'schedules.txt'
+    path.write_text("Month 1: paid out 108334\n")
+
+    with pytest.raises(ValueError):
+        ScheduleReader(path)
@@ -0,0 +1,103 @@
+import random
+import statistics
+
+import pytest
+
+from credit_calculator.calculator import Calculator
+from credit_calculator.portfolio import revalue
+from credit_calculator.summary import BatchSummary
+from credit_calculator.summary import QuantileSketch
+from credit_calculator.summary import Summary
+from credit_calculator.summary import Welford
+
+
+@pytest.fixture()
+def values():
+    generator = random.Random(7)
+
+    yield [generator.lognormvariate(10, 1) for _ in range(20000)]
+
+
+def test_welford_matches_statistics(values):
+    moments = Welford()
+
+    for value in values:
+        moments.add(value)
+
+    assert moments.mean == pytest.approx(statistics.mean(values))
+    assert moments.variance == pytest.approx(statistics.variance(values))
+    assert (moments.min, moments.max) == (min(values), max(values))
+
+
+def test_merged_summaries_match_a_single_pass(values):
+    single = Summary()
+    workers = [Summary() for _ in range(3)]
+
+    for index, value in enumerate(values):
+        single.add(value)
+        workers[index % 3].add(value)
+
+    merged = Summary()
+
+    for worker in workers:
+        merged.merge(worker)
+
+    assert merged.report() == pytest.approx(single.report())
+
+
+@pytest.mark.parametrize('q', [0.5, 0.9, 0.99])
+def test_quantiles_are_within_relative_accuracy(values, q):
+    sketch = QuantileSketch(relative_accuracy=0.01)
+
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    exact = ordered[max(int(q * len(ordered) + 0.999999) - 1, 0)]
+
+    assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_sketch_memory_is_bounded():
+    sketch = QuantileSketch(max_buckets=64)
+
+    for exponent in range(-200, 200):
+        sketch.add(1.5 ** exponent)
+        sketch.add(-(1.5 ** exponent))
+
+    sketch.add(0)
+
+    assert len(sketch.positive) <= 64
+    assert len(sketch.negative) <= 64
+    assert sketch.quantile(0.5) == 0
+
+
+def test_calculator_values():
+    calculator = Calculator()
+    calculator.calculate(['--type', 'annuity', '--principal', '500000', '--payment', '22000', '--interest', '7.8'])
+
+    assert calculator.values == {'principal': 500000, 'payment': 22000, 'overpayment': 50000, 'term': 25}
+
+    calculator.calculate(['--type', 'diff', '--principal', '500000', '--periods', '8', '--interest', '7.8'])
+
+    assert calculator.values == {'payment': 65750, 'overpayment': 14628, 'term': 8}
+
+
+def test_portfolio_summary_covers_unchanged_loans(tmp_path):
+    loans, snapshot, delta = tmp_path / 'loans.csv', tmp_path / 'snapshot.json', tmp_path / 'delta.jsonl'
+    loans.write_text("loan_id,type,principal,periods,interest,payment\n"
+                     "a,annuity,1000000,60,10,\n"
+                     "b,annuity,,120,5.6,8722\n"
+                     "c,diff,500000,8,7.8,\n"
+                     "d,annuity,-1,60,10,\n")
+    revalue(loans, snapshot, delta)
+
+    summary = BatchSummary()
+    revalue(loans, snapshot, delta, summary)
+    report = summary.report()
+
+    assert sorted(report) == ['annuity', 'diff']
+    assert report['annuity']['payment']['count'] == 2
+    assert report['annuity']['payment']['min'] == 8722
+    assert report['annuity']['overpayment']['max'] == 274880
+    assert report['diff']['term']['p50'] == 8